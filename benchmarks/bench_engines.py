@@ -0,0 +1,68 @@
+"""Compare the scheduler engines on large batches.
+
+Run with `python -m benchmarks.bench_engines [<batch size> ...]`.
+"""
+import random
+import sys
+import time
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from peewee import SqliteDatabase
+
+from models.event import Event, RecurrenceException
+from src.scheduler import Scheduler
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+FIRST_DAY = datetime(2022, 8, 22)
+
+
+def generate_events(rng: random.Random, count: int, first_day: datetime, days: int) -> list[dict]:
+    """Generate random events, spread over the days, in ascending order of start time."""
+    events = []
+    for i in range(count):
+        start = first_day + timedelta(days=rng.randrange(days), hours=8, minutes=5 * rng.randrange(130))
+        duration = 5 * rng.randrange(1, 24)
+        events.append(
+            {"start": start, "end": start + timedelta(minutes=duration), "duration": duration, "description": str(i)}
+        )
+    return sorted(events, key=lambda event: event["start"])
+
+
+def time_split(engine: str, existing_events: list[dict], new_events: list[dict]) -> tuple[float, Scheduler]:
+    """Time splitting the new events into scheduled and unscheduled events."""
+    scheduler = Scheduler(engine=engine)
+    scheduler.existing_events = deepcopy(existing_events)
+    new_events = deepcopy(new_events)
+    start = time.perf_counter()
+    scheduler.split_new_events(new_events)
+    return time.perf_counter() - start, scheduler
+
+
+def main(sizes: list[int]):
+    db = SqliteDatabase(":memory:")
+    db.bind([Event, RecurrenceException])
+    db.create_tables([Event, RecurrenceException])
+
+    # Import numpy before timing anything.
+    time_split("numpy", [], [])
+
+    rng = random.Random(0)
+    print(f"{'batch size':>12} {'python (s)':>12} {'numpy (s)':>12} {'speedup':>10}")
+    for size in sizes:
+        # The existing calendar is followed by the batch being scheduled, both with about 20 events a day.
+        days = max(size // 20, 1)
+        existing_events = generate_events(rng, size, FIRST_DAY, days)
+        for event in existing_events:
+            event.pop("duration")
+        new_events = generate_events(rng, size, FIRST_DAY + timedelta(days=days), days)
+
+        python_time, python_scheduler = time_split("python", existing_events, new_events)
+        numpy_time, numpy_scheduler = time_split("numpy", existing_events, new_events)
+        assert numpy_scheduler.scheduled_events == python_scheduler.scheduled_events
+        assert numpy_scheduler.unscheduled_events == python_scheduler.unscheduled_events
+        print(f"{size:>12} {python_time:>12.3f} {numpy_time:>12.3f} {python_time / numpy_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or list(DEFAULT_SIZES))
@@ -0,0 +1,233 @@
+"""Schedule large random calendars with each engine, check the invariants of the schedules and time them.
+
+Run with `python -m benchmarks.fuzz_engines [<batch size> ...]`.
+The python engine is the reference, the other engines should schedule every event the same way.
+"""
+import random
+import sys
+import time
+from copy import deepcopy
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+from peewee import SqliteDatabase, chunked
+
+from benchmarks.bench_engines import FIRST_DAY, generate_events
+from models.event import Event, RecurrenceException
+from src.recurrence import iter_occurrences
+from src.scheduler import ENGINES, Scheduler
+from src.storage import insert_single_events
+from src.utils import (
+    clip_to_workday,
+    get_next_workday_start,
+    get_recurring_events,
+    get_single_events,
+    get_workday_end,
+    get_workday_start,
+    is_outside_workdays,
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+MODELS = [Event, RecurrenceException]
+RECURRENCES = ("daily", "weekly", "weekdays")
+# Rules end after a few days or weeks, or ten years on.
+UNTIL_DAYS = (3, 30, 3650)
+# About as many recurring events as there are meetings in a week, whatever the size of the calendar.
+RULE_COUNT = 10
+
+
+def generate_calendar(rng: random.Random, count: int, first_day: datetime) -> list[dict]:
+    """Generate single events which don't need rescheduling, one after another on the workdays from the first day.
+
+    A few recurring events are added after the single events. They were saved without being checked, so they can
+    overlap the single events and be outside the workday.
+    The first day should be a weekday at midnight.
+    """
+    events = []
+    end = get_workday_start(first_day)
+    for i in range(count):
+        start = end + timedelta(minutes=5 * rng.randrange(12))
+        duration = timedelta(minutes=5 * rng.randrange(1, 24))
+        if start + duration > get_workday_end(start):
+            start = get_next_workday_start(start)
+        end = start + duration
+        events.append({"start": start, "end": end, "description": f"existing {i}"})
+    rule_count = rng.randrange(RULE_COUNT)
+    return events + generate_recurring_events(rng, rule_count, first_day, within_workday=False, prefix="existing rule")
+
+
+def generate_recurring_events(
+    rng: random.Random, count: int, first_day: datetime, within_workday: bool = True, prefix: str = "rule"
+) -> list[dict]:
+    """Generate recurring events starting in the first two weeks from the first day, with a count or an until date.
+
+    The first day should be at midnight. Unless `within_workday` is set, the rules start at any time of the day, so
+    some of them are outside the workday.
+    """
+    events = []
+    for i in range(count):
+        recurrence = rng.choice(RECURRENCES)
+        day = first_day + timedelta(days=rng.randrange(14))
+        duration = 5 * rng.randrange(1, 13)
+        if within_workday:
+            if recurrence == "weekly" and day.isoweekday() > 5:
+                day = get_next_workday_start(day)
+            start = get_workday_start(day) + timedelta(minutes=5 * rng.randrange((9 * 60 - duration) // 5 + 1))
+        else:
+            start = day + timedelta(minutes=5 * rng.randrange((24 * 60 - duration) // 5))
+        event = {
+            "start": start,
+            "end": start + timedelta(minutes=duration),
+            "duration": duration,
+            "description": f"{prefix} {i}",
+            "recurrence": recurrence,
+            "recurrence_until": None,
+            "recurrence_count": None,
+        }
+        if rng.random() < 0.5:
+            event["recurrence_count"] = rng.randrange(1, 30)
+        else:
+            event["recurrence_until"] = start.date() + timedelta(days=rng.choice(UNTIL_DAYS))
+        events.append(event)
+    return events
+
+
+def insert_events(events: list[dict]):
+    """Save the events to the db, in batches small enough for sqlite."""
+    single_events = [event for event in events if not event.get("recurrence")]
+    recurring_events = [
+        {key: value for key, value in event.items() if key != "duration"}
+        for event in events
+        if event.get("recurrence")
+    ]
+    with Event._meta.database.atomic():
+        for batch in chunked(single_events, 100):
+            insert_single_events(batch, [Event.id, Event.description, Event.start, Event.end])
+        for batch in chunked(recurring_events, 100):
+            Event.insert_many(batch).execute()
+
+
+def _get_occurrences(recurring_events: list[dict], end: datetime) -> list[dict]:
+    """Get the time blocked by the occurrences of the recurring events in the workdays, from the first one to the end.
+
+    Only the part of an occurrence within the workday blocks time, weekend occurrences don't block any.
+    """
+    start = min((event["start"] for event in recurring_events), default=end)
+    occurrences = []
+    for event in recurring_events:
+        for occurrence in iter_occurrences(event, start, end, event["exdates"]):
+            if occurrence := clip_to_workday(occurrence):
+                occurrences.append({**occurrence, "id": event["id"]})
+    return occurrences
+
+
+def _get_overlaps(events: list[dict], rescheduled_ids: set) -> list[str]:
+    """Find the rescheduled events which overlap any other event, the events should be sorted on start time.
+
+    An event overlaps an earlier one if it starts before the latest end so far. Only the overlaps of the rescheduled
+    events are checked, as events which fit at their start time are kept there even if they overlap.
+    """
+    overlaps = []
+    latest_end = latest_rescheduled_end = datetime.min
+    for event in events:
+        is_rescheduled = event["id"] in rescheduled_ids
+        if event["start"] < (latest_end if is_rescheduled else latest_rescheduled_end):
+            overlaps.append(f"Rescheduled event overlaps another event: {Event(**event)}")
+        latest_end = max(latest_end, event["end"])
+        if is_rescheduled:
+            latest_rescheduled_end = max(latest_rescheduled_end, event["end"])
+    return overlaps
+
+
+def get_violations(new_events: list[dict], scheduled_events: list[dict]) -> list[str]:
+    """Check the invariants of the schedule, and return a message for each violation.
+
+    `new_events` are the events as they were given to the scheduler, with unique descriptions, and `scheduled_events`
+    are the same events after scheduling. Every event should be scheduled once, inside the workday on a weekday and
+    for as long as it was given. Every recurring event should be saved once, and its occurrences which were
+    rescheduled should be scheduled like the single events.
+    Rescheduled events and the occurrences of the new recurring events shouldn't overlap any other event in the db,
+    up to the end of the last single event.
+    """
+    requested_events = {event["description"]: event for event in new_events}
+    requested_rules = {event["description"] for event in new_events if event.get("recurrence")}
+    recurring_events = get_recurring_events()
+    violations = []
+    single_events = [event for event in scheduled_events if event["description"] not in requested_rules]
+    if sorted(event["description"] for event in single_events) != sorted(requested_events.keys() - requested_rules):
+        violations.append("Every event should be scheduled once")
+    saved_rules = [event["description"] for event in recurring_events if event["description"] in requested_rules]
+    if sorted(saved_rules) != sorted(requested_rules):
+        violations.append("Every recurring event should be saved once")
+
+    for event in scheduled_events:
+        requested_event = requested_events.get(event["description"])
+        if requested_event is None:
+            continue
+        if "requested_start" in event:
+            duration = timedelta(minutes=requested_event["duration"])
+        else:
+            duration = requested_event["end"] - requested_event["start"]
+        if event["end"] - event["start"] != duration:
+            violations.append(f"Event duration changed: {Event(**event)}")
+        if is_outside_workdays(event):
+            violations.append(f"Event outside the workday: {Event(**event)}")
+
+    rescheduled_ids = {event["id"] for event in scheduled_events if "requested_start" in event}
+    rescheduled_ids.update(event["id"] for event in recurring_events if event["description"] in requested_rules)
+    events = list(get_single_events().dicts())
+    end = max((event["end"] for event in events), default=datetime.min)
+    occurrences = _get_occurrences(recurring_events, end)
+    events = sorted(events + occurrences, key=lambda event: event["start"])
+    violations.extend(_get_overlaps(events, rescheduled_ids))
+    return violations
+
+
+def schedule(engine: str, new_events: list[dict]) -> tuple[float, list[dict]]:
+    """Schedule a copy of the new events, and return the time it took and the scheduled events."""
+    new_events = deepcopy(new_events)
+    start = time.perf_counter()
+    scheduler = Scheduler(engine=engine)
+    scheduler.schedule_events(new_events)
+    return time.perf_counter() - start, scheduler.scheduled_events
+
+
+def _get_schedule(scheduled_events: list[dict]) -> list[tuple]:
+    return [(event["start"], event["end"], event["description"]) for event in scheduled_events]
+
+
+def main(sizes: list[int]):
+    engines = [engine for engine in ENGINES if engine == "python" or find_spec(engine)]
+
+    rng = random.Random(0)
+    print(f"{'batch size':>12} {'engine':>8} {'time (s)':>10} {'violations':>11} {'same as python':>15}")
+    for size in sizes:
+        # The batch is spread over the days of the calendar, so that it's rescheduled into the gaps between events.
+        calendar = generate_calendar(rng, size, FIRST_DAY)
+        days = (max(event["end"] for event in calendar) - FIRST_DAY).days + 1
+        new_events = generate_events(rng, size, FIRST_DAY, days)
+        for event in rng.sample(new_events, size // 10):
+            event["latest_end"] = event["end"] + timedelta(hours=rng.randrange(48))
+        new_events.extend(generate_recurring_events(rng, RULE_COUNT, FIRST_DAY))
+
+        reference_schedule = None
+        for engine in engines:
+            # A new db for each run, so that no tables are left over from the previous one.
+            db = SqliteDatabase(":memory:")
+            db.bind(MODELS)
+            db.create_tables(MODELS)
+            insert_events(calendar)
+            runtime, scheduled_events = schedule(engine, new_events)
+            violations = get_violations(new_events, scheduled_events)
+            for violation in violations[:5]:
+                print(violation, file=sys.stderr)
+
+            engine_schedule = _get_schedule(scheduled_events)
+            if reference_schedule is None:
+                reference_schedule = engine_schedule
+            is_same = engine_schedule == reference_schedule
+            print(f"{size:>12} {engine:>8} {runtime:>10.3f} {len(violations):>11} {str(is_same):>15}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or list(DEFAULT_SIZES))
@@ -0,0 +1,101 @@
+"""Replay the shape of a profiled run, saved with `PROFILE_DIR`, with each engine.
+
+Run with `python -m benchmarks.replay_shape <shape file> [<seed>]`.
+A calendar and a batch of new events are generated with the counts and the histograms of the shape, scheduled with
+each engine and checked like in `benchmarks.fuzz_engines`. Recurring events are replayed as single events.
+"""
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+from peewee import SqliteDatabase
+
+from benchmarks.bench_engines import FIRST_DAY
+from benchmarks.fuzz_engines import MODELS, get_violations, insert_events, schedule
+from src.constants import MINUTES_IN_9_HOURS
+from src.scheduler import ENGINES
+from src.utils import get_next_workday_start, get_workday_end, get_workday_start
+
+
+def sample_minutes(rng: random.Random, histogram: dict, minimum: int = 0) -> int:
+    """Pick a bin weighted by its count, and a multiple of 5 minutes in it.
+
+    The last bin has no upper bound, its lower bound is used.
+    """
+    bins, counts = histogram["bins"], histogram["counts"]
+    if not any(counts):
+        return minimum
+    i = rng.choices(range(len(bins)), weights=counts)[0]
+    minutes = bins[i] + 5 * rng.randrange((bins[i + 1] - bins[i]) // 5) if i + 1 < len(bins) else bins[i]
+    return max(minutes, minimum)
+
+
+def generate_calendar(rng: random.Random, shape: dict, first_day: datetime) -> list[dict]:
+    """Generate the existing events of the shape, one after another on the workdays from the first day."""
+    events = []
+    end = get_workday_start(first_day)
+    for i in range(shape["count"]):
+        start = end + timedelta(minutes=sample_minutes(rng, shape["gaps"]))
+        duration = timedelta(minutes=sample_minutes(rng, shape["durations"], minimum=5))
+        if start + duration > get_workday_end(start):
+            start = get_next_workday_start(start)
+        end = start + duration
+        events.append({"start": start, "end": end, "description": f"existing {i}"})
+    return events
+
+
+def generate_new_events(rng: random.Random, shape: dict, first_day: datetime) -> list[dict]:
+    """Generate the new events of the shape, spread over its days from the first day.
+
+    The events outside the workdays start in the evening, so that they're rescheduled.
+    """
+    outside_workdays = set(rng.sample(range(shape["count"]), shape["outside_workdays"]))
+    with_priority = set(rng.sample(range(shape["count"]), shape["with_priority"]))
+    events = []
+    for i in range(shape["count"]):
+        day = first_day + timedelta(days=rng.randrange(max(shape["days"], 1)))
+        duration = sample_minutes(rng, shape["durations"], minimum=5)
+        if i in outside_workdays:
+            start = get_workday_end(day) + timedelta(minutes=5 * rng.randrange(12))
+        else:
+            if day.isoweekday() > 5:
+                day = get_next_workday_start(day)
+            # Early enough in the workday to fit in it.
+            latest_start = MINUTES_IN_9_HOURS - duration
+            start = get_workday_start(day) + timedelta(minutes=5 * rng.randrange(latest_start // 5 + 1))
+        end = start + timedelta(minutes=duration)
+        event = {"start": start, "end": end, "duration": duration, "description": str(i)}
+        if i in with_priority:
+            event["priority"] = 1
+        events.append(event)
+    return sorted(events, key=lambda event: event["start"])
+
+
+def main(path: str, seed: int):
+    with open(path) as file:
+        shape = json.load(file)
+    engines = [engine for engine in ENGINES if engine == "python" or find_spec(engine)]
+
+    rng = random.Random(seed)
+    calendar = generate_calendar(rng, shape["existing_events"], FIRST_DAY)
+    new_events = generate_new_events(
+        rng, shape["new_events"], FIRST_DAY + timedelta(days=shape["new_events"]["offset_days"])
+    )
+    print(f"{len(calendar)} existing events, {len(new_events)} new events")
+    print(f"{'engine':>8} {'time (s)':>10} {'violations':>11}")
+    for engine in engines:
+        db = SqliteDatabase(":memory:")
+        db.bind(MODELS)
+        db.create_tables(MODELS)
+        insert_events(calendar)
+        runtime, scheduled_events = schedule(engine, new_events)
+        violations = get_violations(new_events, scheduled_events)
+        for violation in violations[:5]:
+            print(violation, file=sys.stderr)
+        print(f"{engine:>8} {runtime:>10.3f} {len(violations):>11}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,63 @@
+import argparse
+import sys
+from datetime import datetime
+
+from models.event import Event
+from src.constants import DATE_FORMAT
+from src.exceptions import ValidationError
+from src.scheduler import Scheduler
+from src.utils import get_all_events
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Dates should be in the format YYYY/MM/DD HH:mm: {value}") from None
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="List, delete or move the scheduled events.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List the events with their ids.")
+    list_parser.add_argument("--from", type=parse_date, dest="start", help="List the events starting after this.")
+    list_parser.add_argument("--to", type=parse_date, dest="end", help="List the events starting before this.")
+
+    delete_parser = commands.add_parser("delete", help="Delete the event, all the occurrences of a recurring event.")
+    delete_parser.add_argument("event_id", help="Id of the event, as listed.")
+
+    move_parser = commands.add_parser("move", help="Move the event to the start, keeping its duration.")
+    move_parser.add_argument("event_id", help="Id of the event, as listed.")
+    move_parser.add_argument("start", type=parse_date, help="New start of the event.")
+
+    for command_parser in (delete_parser, move_parser):
+        command_parser.add_argument(
+            "--pull-earlier",
+            action="store_true",
+            help="Move the events which were pushed later when scheduling into the freed time.",
+        )
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    if args.command == "list":
+        for event in get_all_events(args.start, args.end):
+            print(f"{event.id}  {event}")
+        return
+
+    scheduler = Scheduler()
+    if args.command == "delete":
+        pulled_events = scheduler.delete_event(args.event_id, args.pull_earlier)
+    else:
+        pulled_events = scheduler.move_event(args.event_id, args.start, args.pull_earlier)
+    for event in pulled_events:
+        print(f"Pulled earlier: {Event(**event)}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (ValidationError, Event.DoesNotExist) as e:
+        sys.exit(e)
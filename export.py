@@ -0,0 +1,37 @@
+import argparse
+import sys
+from datetime import datetime
+
+from src.constants import DATE_FORMAT
+from src.exceptions import ValidationError
+from src.export import FORMATS, export_events
+
+
+def parse_range_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Dates should be in the format YYYY/MM/DD HH:mm: {value}") from None
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export the events to an iCalendar, CSV or JSON Lines file.")
+    parser.add_argument("path", help="File to export to.")
+    parser.add_argument("--format", choices=FORMATS, default="ics", dest="export_format")
+    parser.add_argument("--from", type=parse_range_date, dest="start", help="Export the events ending after this.")
+    parser.add_argument("--to", type=parse_range_date, dest="end", help="Export the events starting before this.")
+    parser.add_argument("--gzip", action="store_true", dest="compress", help="Compress the file with gzip.")
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    count = export_events(**vars(args))
+    print(f"Exported {count} events to {args.path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except ValidationError as e:
+        sys.exit(e)
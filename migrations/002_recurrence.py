@@ -0,0 +1,36 @@
+"""Peewee migrations -- 002_recurrence.py."""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+SQL = pw.SQL
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your migrations here."""
+
+    migrator.add_fields(
+        "event",
+        recurrence=pw.CharField(max_length=255, null=True),
+        recurrence_until=pw.DateField(null=True),
+        recurrence_count=pw.IntegerField(null=True),
+    )
+
+    @migrator.create_model
+    class RecurrenceException(pw.Model):
+        id = pw.AutoField()
+        event = pw.ForeignKeyField(
+            column_name="event_id", field="id", model=migrator.orm["event"], on_delete="CASCADE"
+        )
+        occurrence = pw.DateTimeField()
+
+        class Meta:
+            table_name = "recurrence_exception"
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your rollback migrations here."""
+
+    migrator.remove_model("recurrence_exception")
+
+    migrator.remove_fields("event", "recurrence", "recurrence_until", "recurrence_count")
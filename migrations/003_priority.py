@@ -0,0 +1,22 @@
+"""Peewee migrations -- 003_priority.py."""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+SQL = pw.SQL
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your migrations here."""
+
+    migrator.add_fields(
+        "event",
+        priority=pw.IntegerField(default=0),
+        latest_end=pw.DateTimeField(null=True),
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your rollback migrations here."""
+
+    migrator.remove_fields("event", "priority", "latest_end")
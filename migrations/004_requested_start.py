@@ -0,0 +1,19 @@
+"""Peewee migrations -- 004_requested_start.py."""
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+SQL = pw.SQL
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your migrations here."""
+
+    migrator.add_fields("event", requested_start=pw.DateTimeField(null=True, index=True))
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    """Write your rollback migrations here."""
+
+    migrator.drop_index("event", "requested_start")
+    migrator.remove_fields("event", "requested_start")
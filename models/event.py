@@ -1,9 +1,9 @@
 from uuid import uuid4
 
-from peewee import DateTimeField, Model, TextField, UUIDField
+from peewee import CharField, DateField, DateTimeField, ForeignKeyField, IntegerField, Model, TextField, UUIDField
 
 from models import db
-from src.constants import DATE_FORMAT
+from src.constants import DATE_FORMAT, OPTION_DELIMITER, UNTIL_DATE_FORMAT
 
 
 class Event(Model):
@@ -11,6 +11,15 @@ class Event(Model):
     description = TextField()
     start = DateTimeField(index=True)
     end = DateTimeField(index=True)
+    # Recurring events are stored as a single rule, the occurrences are generated on demand.
+    recurrence = CharField(null=True)
+    recurrence_until = DateField(null=True)
+    recurrence_count = IntegerField(null=True)
+    # Events with higher priority, then earlier latest end, get the earlier slots when rescheduling.
+    priority = IntegerField(default=0)
+    latest_end = DateTimeField(null=True)
+    # The start asked for, if the event was rescheduled. Lets freed time pull the event back earlier.
+    requested_start = DateTimeField(null=True, index=True)
 
     class Meta:
         database = db
@@ -18,5 +27,23 @@ class Event(Model):
     def duration(self):
         return self.end - self.start
 
+    def recurrence_rule(self):
+        if self.recurrence_count:
+            return f"{self.recurrence} count {self.recurrence_count}"
+        return f"{self.recurrence} until {self.recurrence_until.strftime(UNTIL_DATE_FORMAT)}"
+
     def __str__(self):
-        return f"{self.start.strftime(DATE_FORMAT)} -> {self.end.strftime(DATE_FORMAT)} - {self.description}"
+        event = f"{self.start.strftime(DATE_FORMAT)} -> {self.end.strftime(DATE_FORMAT)} - {self.description}"
+        if self.recurrence:
+            event += OPTION_DELIMITER + self.recurrence_rule()
+        return event
+
+
+# An occurrence of a recurring event that has been cancelled.
+class RecurrenceException(Model):
+    event = ForeignKeyField(Event, backref="exceptions", on_delete="CASCADE")
+    occurrence = DateTimeField()
+
+    class Meta:
+        database = db
+        table_name = "recurrence_exception"
@@ -1,26 +1,34 @@
 import sys
 
+from src.config import PROFILE_DIR
 from src.event_parser import parse_input_events
 from src.exceptions import ValidationError
+from src.profiling import profile_run
 from src.scheduler import Scheduler
-from src.utils import display_all_events
+from src.utils import display_all_events, display_missed_deadline_events
 
 input_events = sys.argv[1]
 
 
-def main():
-    # Parse input events
-    events = parse_input_events(input_events)
+def main(events: list[dict]):
     # Schedule these events.
-    Scheduler().schedule_events(events)
+    scheduler = Scheduler()
+    scheduler.schedule_events(events)
     # Display all the events.
     display_all_events()
+    # Report the events which couldn't be scheduled before their latest end.
+    display_missed_deadline_events(scheduler.missed_deadline_events)
     # Return a list
     # return list(get_all_events().dicts())
 
 
 if __name__ == "__main__":
     try:
-        main()
+        if PROFILE_DIR:
+            # The input is parsed in the profiled run, so that the parser shows in the hotspots.
+            profile_run(lambda: parse_input_events(input_events), main, PROFILE_DIR)
+        else:
+            # Parse input events
+            main(parse_input_events(input_events))
     except ValidationError as e:
         sys.exit(e)
@@ -1,3 +1,9 @@
 import os
 
 DB_NAME = os.getenv("DB_NAME", "garendar.db")
+# `python` or `numpy`, the numpy engine checks large batches of events faster.
+SCHEDULER_ENGINE = os.getenv("SCHEDULER_ENGINE", "python")
+# Store the single events in a table for each month, so that large calendars are read and written a month at a time.
+SHARD_EVENTS_BY_MONTH = os.getenv("SHARD_EVENTS_BY_MONTH", "false").lower() in {"1", "true"}
+# Profile the runs of `scheduler.py`, and write the stats and the shape of the input to this directory.
+PROFILE_DIR = os.getenv("PROFILE_DIR")
@@ -3,3 +3,8 @@ EVENT_DELIMITER = " - "
 DURATION_DELIMITER = " -> "
 DATE_FORMAT = "%Y/%m/%d %H:%M"
 MINUTES_IN_9_HOURS = 9 * 60
+OPTION_DELIMITER = " | "
+UNTIL_DATE_FORMAT = "%Y/%m/%d"
+RECURRENCE_FREQUENCIES = ("daily", "weekly", "weekdays")
+PRIORITY_OPTION = "priority"
+LATEST_END_OPTION = "by"
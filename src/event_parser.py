@@ -1,6 +1,17 @@
 from datetime import datetime
 
-from src.constants import DATE_FORMAT, DURATION_DELIMITER, EVENT_DELIMITER, INPUT_DELIMITER, MINUTES_IN_9_HOURS
+from src.constants import (
+    DATE_FORMAT,
+    DURATION_DELIMITER,
+    EVENT_DELIMITER,
+    INPUT_DELIMITER,
+    LATEST_END_OPTION,
+    MINUTES_IN_9_HOURS,
+    OPTION_DELIMITER,
+    PRIORITY_OPTION,
+    RECURRENCE_FREQUENCIES,
+    UNTIL_DATE_FORMAT,
+)
 from src.exceptions import ValidationError
 from src.utils import calculate_duration_minutes
 
@@ -22,6 +33,69 @@ def validate_event(start_time: datetime, end_time: datetime, duration: float, ev
         raise ValidationError(f"Event Start can't be after event end: {event_details}")
 
 
+def _split_options(event: str) -> tuple[str, dict[str, str]]:
+    """Split the options, like the recurrence rule or the priority, from the event description.
+
+    Return the description and the options keyed on their first word, recurrence rules are keyed on `recurrence`.
+    """
+    options = {}
+    while True:
+        description, _, option = event.rpartition(OPTION_DELIMITER)
+        option = option.strip()
+        name = option.partition(" ")[0]
+        if not description or name not in {*RECURRENCE_FREQUENCIES, PRIORITY_OPTION, LATEST_END_OPTION}:
+            return event, options
+        options["recurrence" if name in RECURRENCE_FREQUENCIES else name] = option
+        event = description
+
+
+def parse_scheduling_options(options: dict[str, str], end_time: datetime, event_details: str) -> dict:
+    """Parse the priority and the latest end of the event into dict of python datatypes."""
+    event_options = {}
+    try:
+        if PRIORITY_OPTION in options:
+            event_options["priority"] = int(options[PRIORITY_OPTION].partition(" ")[2])
+    except ValueError:
+        raise ValidationError(f"Priority should be a whole number: {event_details}") from None
+
+    try:
+        if LATEST_END_OPTION in options:
+            latest_end = options[LATEST_END_OPTION].partition(" ")[2].strip()
+            event_options["latest_end"] = datetime.strptime(latest_end, DATE_FORMAT)
+    except ValueError:
+        raise ValidationError(f"Latest end should be in the format YYYY/MM/DD HH:mm: {event_details}") from None
+
+    if "latest_end" in event_options:
+        if event_options["latest_end"] < end_time:
+            raise ValidationError(f"Latest end can't be before event end: {event_details}")
+        if "recurrence" in options:
+            raise ValidationError(f"Recurring events can't have a latest end: {event_details}")
+    return event_options
+
+
+def parse_recurrence(recurrence: str, start_time: datetime, event_details: str) -> dict:
+    """Parse recurrence rule, like `weekly until 2022/12/31` or `daily count 10`, into dict of python datatypes."""
+    frequency, _, limit = recurrence.partition(" ")
+    limit_type, _, limit_value = limit.strip().partition(" ")
+    rule = {"recurrence": frequency, "recurrence_until": None, "recurrence_count": None}
+    try:
+        if limit_type == "until":
+            rule["recurrence_until"] = datetime.strptime(limit_value.strip(), UNTIL_DATE_FORMAT).date()
+        elif limit_type == "count":
+            rule["recurrence_count"] = int(limit_value)
+        else:
+            raise ValidationError(f"Recurring events need an until date or a count: {event_details}")
+    except ValueError:
+        raise ValidationError(f"Invalid recurrence, use `until YYYY/MM/DD` or `count N`: {event_details}") from None
+
+    if rule["recurrence_until"] and rule["recurrence_until"] < start_time.date():
+        raise ValidationError(f"Recurrence can't end before event start: {event_details}")
+
+    if rule["recurrence_count"] is not None and rule["recurrence_count"] < 1:
+        raise ValidationError(f"Recurrence count should be at least 1: {event_details}")
+    return rule
+
+
 def parse_event_details(event_details: str) -> dict:
     """Parse event string into dict of python datatypes."""
     start_time, _, end_time_n_event = event_details.partition(DURATION_DELIMITER)
@@ -37,7 +111,13 @@ def parse_event_details(event_details: str) -> dict:
     duration = _get_event_duration(start_time, end_time)
 
     validate_event(start_time, end_time, duration, event_details)
-    return {"start": start_time, "end": end_time, "duration": duration, "description": event.strip()}
+    event, options = _split_options(event)
+    event_dict = {"start": start_time, "end": end_time, "duration": duration, "description": event.strip()}
+    # Recurring events carry their rule, the occurrences are expanded only when scheduling.
+    if "recurrence" in options:
+        event_dict.update(parse_recurrence(options["recurrence"], start_time, event_details))
+    event_dict.update(parse_scheduling_options(options, end_time, event_details))
+    return event_dict
 
 
 def parse_input_events(event_list: str) -> list[dict]:
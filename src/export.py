@@ -0,0 +1,190 @@
+"""Stream the events from the db to iCalendar, CSV or JSON Lines files.
+
+Rows are read from the db cursor and written as they are read, so the memory used doesn't depend on the number of
+events. The values are written as stored in the db, without building model instances or converting them to python
+objects and back.
+"""
+import csv
+import gzip
+import io
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta, timezone
+from typing import IO
+
+from peewee import ModelSelect, SelectQuery
+
+from models.event import Event, RecurrenceException
+from src.exceptions import ValidationError
+from src.recurrence import get_occurrence_start
+from src.storage import select_events
+
+FORMATS = ("ics", "csv", "jsonl")
+# Size of the write buffer, rows are written to the file in blocks of this size.
+BUFFER_SIZE = 1024 * 1024
+# The default level of the gzip command, python defaults to 9 which is several times slower for a bit smaller files.
+GZIP_LEVEL = 6
+EXPORT_FIELDS = (
+    Event.id,
+    Event.description,
+    Event.start,
+    Event.end,
+    Event.recurrence,
+    Event.recurrence_until,
+    Event.recurrence_count,
+    Event.priority,
+    Event.latest_end,
+)
+EXPORT_COLUMNS = tuple(field.name for field in EXPORT_FIELDS)
+ICS_FREQUENCIES = {"daily": "FREQ=DAILY", "weekly": "FREQ=WEEKLY", "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"}
+# Lines longer than this many octets are folded, as required by RFC 5545.
+ICS_LINE_LENGTH = 75
+
+
+def get_export_query(start: datetime | None = None, end: datetime | None = None) -> SelectQuery:
+    """Get the rows of the events overlapping the time range, in ascending order of start time.
+
+    Recurring events are exported as their rule, they're included if the rule hasn't ended before the range starts.
+    """
+
+    def build_query(model: type[Event]) -> ModelSelect:
+        query = model.select(*(model._meta.fields[field.name] for field in EXPORT_FIELDS))
+        if end:
+            query = query.where(model.start < end)
+        if start:
+            is_recurring = model.recurrence.is_null(False) & (
+                model.recurrence_until.is_null() | (model.recurrence_until >= start.date())
+            )
+            query = query.where((model.end > start) | is_recurring)
+        return query
+
+    # An event is at most a day long, so events overlapping the range start at most a day before it.
+    return select_events(build_query, start and start - timedelta(days=1), end)
+
+
+def _open_export_file(path: str, compress: bool) -> IO[str]:
+    """Open the file to export to, through a write buffer and gzip if compressed."""
+    if compress:
+        file = io.BufferedWriter(gzip.open(path, "wb", compresslevel=GZIP_LEVEL), buffer_size=BUFFER_SIZE)
+    else:
+        file = open(path, "wb", buffering=BUFFER_SIZE)
+    return io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+
+def _write_csv(file: IO[str], rows: Iterable[tuple]):
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+
+
+def _write_jsonl(file: IO[str], rows: Iterable[tuple]):
+    file.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row, strict=True))) + "\n" for row in rows)
+
+
+def _format_ics_datetime(value: str) -> str:
+    """Format the datetime, as stored in the db, as an iCalendar local time."""
+    return value[:19].replace("-", "").replace(":", "").replace(" ", "T")
+
+
+def _escape_ics_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold_ics_line(line: str) -> str:
+    """Split lines longer than the limit in UTF-8 octets, continuation lines start with a space.
+
+    Lines are split between characters, so that a multi-octet character isn't split across lines.
+    """
+    if len(line.encode()) <= ICS_LINE_LENGTH:
+        return line + "\r\n"
+    parts = []
+    part_start = part_length = 0
+    # The space starting a continuation line counts towards its length.
+    limit = ICS_LINE_LENGTH
+    for i, char in enumerate(line):
+        char_length = len(char.encode())
+        if part_length + char_length > limit:
+            parts.append(line[part_start:i])
+            part_start, part_length, limit = i, 0, ICS_LINE_LENGTH - 1
+        part_length += char_length
+    parts.append(line[part_start:])
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _get_ics_recurrence_lines(event: dict) -> Iterator[str]:
+    """Get the RRULE of a recurring event and an EXDATE for each of its cancelled occurrences."""
+    rule = ICS_FREQUENCIES[event["recurrence"]]
+    if event["recurrence_count"]:
+        rule += f";COUNT={event['recurrence_count']}"
+    else:
+        until = datetime.combine(date.fromisoformat(event["recurrence_until"]), time.max)
+        rule += f";UNTIL={_format_ics_datetime(str(until))}"
+    yield f"RRULE:{rule}"
+    # Only recurring events query their exceptions, and there are few of those.
+    for (occurrence,) in (
+        RecurrenceException.select(RecurrenceException.occurrence)
+        .where(RecurrenceException.event == event["id"])
+        .order_by(RecurrenceException.occurrence)
+        .tuples()
+    ):
+        yield f"EXDATE:{_format_ics_datetime(str(occurrence))}"
+
+
+def _get_ics_event(row: tuple, timestamp: str) -> str:
+    event = dict(zip(EXPORT_COLUMNS, row, strict=True))
+    start, end = event["start"], event["end"]
+    if event["recurrence"]:
+        # The first occurrence of `weekdays` events can be after the event start.
+        event["start"], event["end"] = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        first_start = get_occurrence_start(event, 0)
+        start, end = str(first_start), str(first_start + (event["end"] - event["start"]))
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event['id']}",
+        f"DTSTAMP:{timestamp}",
+        f"DTSTART:{_format_ics_datetime(start)}",
+        f"DTEND:{_format_ics_datetime(end)}",
+        f"SUMMARY:{_escape_ics_text(event['description'])}",
+    ]
+    if event["recurrence"]:
+        lines.extend(_get_ics_recurrence_lines(event))
+    lines.append("END:VEVENT")
+    return "".join(_fold_ics_line(line) for line in lines)
+
+
+def _write_ics(file: IO[str], rows: Iterable[tuple]):
+    # DTSTAMP has to be in UTC.
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Garendar//Garendar//EN\r\n")
+    file.writelines(_get_ics_event(row, timestamp) for row in rows)
+    file.write("END:VCALENDAR\r\n")
+
+
+WRITERS = {"ics": _write_ics, "csv": _write_csv, "jsonl": _write_jsonl}
+
+
+def _count_rows(rows: Iterable[tuple], counter: list[int]) -> Iterator[tuple]:
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def export_events(
+    path: str,
+    export_format: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    compress: bool = False,
+) -> int:
+    """Export the events overlapping the time range to the file, and return the number of events exported."""
+    if export_format not in WRITERS:
+        raise ValidationError(f"Unknown export format {export_format}, use one of: {', '.join(FORMATS)}")
+    if start and end and start >= end:
+        raise ValidationError("Export range start should be before its end")
+
+    counter = [0]
+    with _open_export_file(path, compress) as file:
+        cursor = Event._meta.database.execute(get_export_query(start, end))
+        WRITERS[export_format](file, _count_rows(cursor, counter))
+    return counter[0]
+
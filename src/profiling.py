@@ -0,0 +1,143 @@
+"""Profile a run of the scheduler, to look into slow runs on calendars we don't have a copy of.
+
+With `PROFILE_DIR` set, each run of `scheduler.py` writes three files to the directory:
+- `<run>.prof`, the cProfile stats, to open with `python -m pstats` or snakeviz.
+- `<run>.txt`, the hotspots in the scheduler, the parser and peewee.
+- `<run>.json`, the shape of the input: the number of events and histograms of their durations and of the gaps
+  between them. It has no descriptions or dates, and can be replayed with `python -m benchmarks.replay_shape`.
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from src.storage import select_events
+from src.utils import calculate_duration_minutes, get_recurring_events, is_outside_workdays
+
+# Functions from these files are listed in the hotspots.
+HOTSPOT_FILES = r"src[/\\](scheduler|event_parser|vectorised)\.py|peewee\.py"
+HOTSPOT_COUNT = 20
+# Lower bounds of the histogram bins in minutes, the last bin has no upper bound.
+DURATION_BINS = (0, 15, 30, 60, 120, 240, 480)
+GAP_BINS = (0, 5, 15, 30, 60, 120, 240, 480)
+
+
+def _get_bin(bins: tuple[int, ...], value: float) -> int:
+    """Get the index of the bin of the value, values below the first bin are in it."""
+    return max(bisect_right(bins, value) - 1, 0)
+
+
+def get_histogram(values: Iterable[float], bins: tuple[int, ...]) -> dict:
+    """Count the values in each bin, values below the first bin are counted in it."""
+    counts = [0] * len(bins)
+    for value in values:
+        counts[_get_bin(bins, value)] += 1
+    return {"bins": list(bins), "counts": counts}
+
+
+def _get_days(events: list[dict]) -> int:
+    """Get the number of days from the first event to the last, the events should be sorted on start time."""
+    return (events[-1]["start"].date() - events[0]["start"].date()).days + 1 if events else 0
+
+
+def _get_existing_events_shape() -> tuple[dict, datetime | None]:
+    """Describe the single events in the db, and get the start of the first one.
+
+    The events are streamed in ascending order of start time, only their start and end are read, and the histograms
+    are counted along. Gaps between consecutive events of each day are counted, not over the night.
+    """
+    query = select_events(
+        lambda model: model.select(model.start, model.end).where(model.recurrence.is_null()), recurring=False
+    )
+    count = overlaps = 0
+    duration_counts = [0] * len(DURATION_BINS)
+    gap_counts = [0] * len(GAP_BINS)
+    first_start = last_start = latest_end = None
+    for start, end in query.tuples().iterator():
+        count += 1
+        duration_counts[_get_bin(DURATION_BINS, calculate_duration_minutes(start, end))] += 1
+        if latest_end and start.date() == latest_end.date():
+            gap = calculate_duration_minutes(latest_end, start)
+            if gap < 0:
+                overlaps += 1
+            else:
+                gap_counts[_get_bin(GAP_BINS, gap)] += 1
+        first_start = first_start or start
+        last_start = start
+        latest_end = max(latest_end, end) if latest_end else end
+    shape = {
+        "count": count,
+        "recurring": Counter(event["recurrence"] for event in get_recurring_events()),
+        "days": (last_start.date() - first_start.date()).days + 1 if count else 0,
+        "durations": {"bins": list(DURATION_BINS), "counts": duration_counts},
+        "gaps": {"bins": list(GAP_BINS), "counts": gap_counts},
+        "overlaps": overlaps,
+    }
+    return shape, first_start
+
+
+def get_input_shape(new_events: list[dict]) -> dict:
+    """Describe the new events and the events in the db, without their descriptions or dates.
+
+    The events in the db are streamed, so that describing a large calendar doesn't load it into memory.
+    """
+    existing_events_shape, first_existing_start = _get_existing_events_shape()
+    new_events = sorted(new_events, key=lambda event: event["start"])
+    return {
+        "existing_events": existing_events_shape,
+        "new_events": {
+            "count": len(new_events),
+            "recurring": Counter(event["recurrence"] for event in new_events if event.get("recurrence")),
+            "days": _get_days(new_events),
+            # Days from the first existing event to the first new event.
+            "offset_days": (
+                (new_events[0]["start"].date() - first_existing_start.date()).days
+                if new_events and first_existing_start
+                else 0
+            ),
+            "durations": get_histogram((event["duration"] for event in new_events), DURATION_BINS),
+            "outside_workdays": sum(is_outside_workdays(event) for event in new_events),
+            "with_priority": sum(bool(event.get("priority")) for event in new_events),
+            "with_latest_end": sum(bool(event.get("latest_end")) for event in new_events),
+        },
+    }
+
+
+def _write_hotspots(profiler: cProfile.Profile, path: str):
+    with open(path, "w") as file:
+        stats = pstats.Stats(profiler, stream=file)
+        for sort_key, title in (("cumulative", "cumulative time"), ("tottime", "time spent in the function itself")):
+            file.write(f"Top {HOTSPOT_COUNT} functions by {title}\n")
+            stats.sort_stats(sort_key).print_stats(HOTSPOT_FILES, HOTSPOT_COUNT)
+
+
+def profile_run(parse: Callable[[], list[dict]], run: Callable[[list[dict]], None], profile_dir: str) -> str:
+    """Parse and run with cProfile, and write the stats, the hotspots and the shape of the input to the directory.
+
+    The new events from `parse` are passed to `run`. The shape is taken between the two, as the run saves the new
+    events, and taking it isn't profiled. Returns the path of the files without the extension.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"garendar-{datetime.now():%Y%m%d-%H%M%S-%f}")
+    profiler = cProfile.Profile()
+
+    def parse_and_run():
+        new_events = parse()
+        profiler.disable()
+        with open(f"{path}.json", "w") as file:
+            json.dump(get_input_shape(new_events), file, indent=2)
+        profiler.enable()
+        run(new_events)
+
+    try:
+        profiler.runcall(parse_and_run)
+    finally:
+        profiler.dump_stats(f"{path}.prof")
+        _write_hotspots(profiler, f"{path}.txt")
+        print(f"Profile written to {path}.prof", file=sys.stderr)
+    return path
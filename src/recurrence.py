@@ -0,0 +1,64 @@
+from collections.abc import Container, Iterator
+from datetime import date, datetime, timedelta
+
+
+def _get_first_weekday(day: date) -> date:
+    """Get the first weekday on or after the given day."""
+    return day + timedelta(days=8 - day.isoweekday()) if day.isoweekday() > 5 else day
+
+
+def get_occurrence_start(event: dict, index: int) -> datetime:
+    """Get the start of the occurrence of a recurring event at the given index."""
+    start = event["start"]
+    if event["recurrence"] == "daily":
+        return start + timedelta(days=index)
+    if event["recurrence"] == "weekly":
+        return start + timedelta(weeks=index)
+
+    # Weekdays, every five occurrences make a week.
+    first_start = datetime.combine(_get_first_weekday(start.date()), start.time())
+    weeks, days = divmod(index, 5)
+    # Skip the weekend if the remaining days spill over it.
+    if first_start.weekday() + days > 4:
+        days += 2
+    return first_start + timedelta(weeks=weeks, days=days)
+
+
+def _get_first_candidate_index(event: dict, window_start: datetime) -> int:
+    """Get an index at or before the first occurrence that can overlap the window.
+
+    An event can't be longer than a day, so any occurrence starting two days before the window start ends before it.
+    """
+    days = (window_start.date() - event["start"].date()).days - 1
+    if days <= 0:
+        return 0
+    if event["recurrence"] == "daily":
+        return days
+    if event["recurrence"] == "weekly":
+        return days // 7
+    # The first weekday can be up to two days after the event start, so step back a week.
+    return max(0, days // 7 - 1) * 5
+
+
+def iter_occurrences(
+    event: dict, window_start: datetime, window_end: datetime | None = None, exdates: Container[datetime] = ()
+) -> Iterator[dict]:
+    """Lazily yield the occurrences of a recurring event that overlap the window, in ascending order.
+
+    Generation starts close to the window start instead of the event start, so the cost depends on the size of the
+    window and not on how far the rule goes back. If there's no `window_end`, occurrences are generated until the rule
+    ends. Occurrences starting at any of the `exdates` have been cancelled and are skipped.
+    """
+    duration = event["end"] - event["start"]
+    until = event.get("recurrence_until")
+    count = event.get("recurrence_count")
+
+    index = _get_first_candidate_index(event, window_start)
+    while count is None or index < count:
+        start = get_occurrence_start(event, index)
+        if (until and start.date() > until) or (window_end and start >= window_end):
+            return
+        index += 1
+        end = start + duration
+        if end > window_start and start not in exdates:
+            yield {"start": start, "end": end, "description": event["description"]}
@@ -1,27 +1,72 @@
 import bisect
+import heapq
 from collections import defaultdict
+from collections.abc import Iterator
 from contextlib import suppress
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from importlib.util import find_spec
+from itertools import chain, pairwise
 from operator import itemgetter
-
-from models.event import Event
+from uuid import uuid4
+
+from models.event import Event, RecurrenceException
+from src.config import SCHEDULER_ENGINE
+from src.exceptions import ValidationError
+from src.recurrence import get_occurrence_start, iter_occurrences
+from src.storage import (
+    get_event,
+    get_first_single_event,
+    get_last_single_event,
+    get_single_event_model,
+    insert_single_events,
+    select_events,
+    update_single_event,
+)
 from src.utils import (
     calculate_duration_minutes,
-    get_all_events,
+    clip_to_workday,
+    get_day_events,
+    get_day_gaps,
     get_next_workday_start,
+    get_recurring_events,
+    get_single_events,
     get_workday_end,
     get_workday_start,
+    is_outside_workdays,
+    iter_overlapping_events,
 )
 
+ENGINES = ("python", "numpy")
+
 
 class Scheduler:
-    def __init__(self):
-        existing_events = get_all_events()
-        self.existing_events = list(existing_events.dicts())
+    def __init__(self, engine: str = SCHEDULER_ENGINE):
+        if engine not in ENGINES:
+            raise ValidationError(f"Scheduler engine should be one of {', '.join(ENGINES)}: {engine}")
+        if engine == "numpy":
+            if find_spec("numpy") is None:
+                raise ValidationError("The numpy engine needs numpy, install it with: pip install numpy")
+        self.engine = engine
+        # The single events in the window, read when scheduling.
+        self.existing_events = []
+        # The single event ending last in the db, the events left over are scheduled after it.
+        self.last_event = None
+        # Recurring events are kept as rules, their occurrences are generated only for the window being checked.
+        self.recurring_events = get_recurring_events()
+        # The days asked for by the batch being scheduled, from the start of the first day to the end of the last.
+        self.window_start = None
+        self.window_end = None
+        self._reset_batch()
+
+    def _reset_batch(self) -> None:
+        """Clear the state of the last batch, so that the scheduler can schedule another one."""
+        self.scheduled_recurring_events = []
         self.unscheduled_events = {}
         self.scheduled_events = []
         self.unscheduled_event_durations = []
         self.unscheduled_slots = defaultdict(list)
+        # Rescheduled events which end after their latest end.
+        self.missed_deadline_events = []
 
     def _clean_unassigned_slots(self, duration: int, sorted_slot_durations: list[int]):
         """Clean unassigned slots.
@@ -53,36 +98,67 @@ class Scheduler:
             or (event2["end"] < event1["start"])
         )
 
+    def get_recurring_occurrences(self, start: datetime, end: datetime) -> Iterator[dict]:
+        """Lazily yield the occurrences of recurring events that overlap the window between start and end."""
+        for event in self.recurring_events:
+            yield from iter_occurrences(event, start, end, event["exdates"])
+
     def persist_new_events(self):
-        """Save new events to the db."""
-        Event.insert_many(self.scheduled_events).execute()
+        """Save new events to the db.
+
+        Recurring events are saved as one rule row, along with a row for each cancelled occurrence.
+        """
+        # Bulk inserts fail without any rows.
+        if self.scheduled_events:
+            # Set the ids here, so that the events in existing_events can be found by id.
+            for event in self.scheduled_events:
+                event.setdefault("id", uuid4())
+            # Only some events have a priority or a latest end, list the fields so that none are left out.
+            fields = [
+                Event.id,
+                Event.description,
+                Event.start,
+                Event.end,
+                Event.priority,
+                Event.latest_end,
+                Event.requested_start,
+            ]
+            insert_single_events(self.scheduled_events, fields)
+        for event in self.scheduled_recurring_events:
+            Event.insert({key: value for key, value in event.items() if key not in {"duration", "exdates"}}).execute()
+            if event["exdates"]:
+                RecurrenceException.insert_many(
+                    [{"event": event["id"], "occurrence": occurrence} for occurrence in event["exdates"]]
+                ).execute()
 
     def _get_last_scheduled_event(self):
         """Get last scheduled event.
 
-        Return the last existing_event if existing_events is populated.
+        Return the existing_event which ends last if existing_events is populated.
+        It's not always the last existing_event, as an earlier event can end after it.
 
         There can be a case if there is no event in the db and all the events are on weekends, then existing_event.
         will be empty. So schedule the first event and return it.
         """
-        if self.existing_events:
-            return self.existing_events[-1]
+        if last_event := self._get_last_event():
+            return last_event
         # Get the first smallest unassigned event.
         smallest_duration = self.unscheduled_event_durations[0]
         event = self.unscheduled_events[smallest_duration].pop(0)
-        event_duration = event.pop("duration")
-        # Schedule the event at the starting of the first workday.
-        event["start"] = get_next_workday_start(event["start"])
-        event["end"] = event["start"] + timedelta(minutes=event_duration)
-        self.scheduled_events.append(event)
-        self._clean_unscheduled_events(event_duration)
-        return event
+        self._clean_unscheduled_events(smallest_duration)
+        return self._schedule_at_free_time(event)
+
+    def _get_last_event(self) -> dict | None:
+        """Get the event ending last, of the events in the window and the event ending last in the db."""
+        events = [*self.existing_events, self.last_event] if self.last_event else self.existing_events
+        return max(events, key=itemgetter("end"), default=None)
 
     def update_unscheduled_events(self, event: dict) -> None:
         """Add events that need rescheduling to unscheduled_events.
 
         Also update unscheduled_event_durations, if required.
         """
+        event.setdefault("requested_start", event["start"])
         duration = event["duration"]
         if duration not in self.unscheduled_event_durations:
             bisect.insort(self.unscheduled_event_durations, duration)
@@ -101,15 +177,73 @@ class Scheduler:
 
         self.unscheduled_slots[gap_duration].append({"start": scheduled_event["end"], "end": slot["end"]})
 
+    def _get_free_slot(self, start_time: datetime, duration: int) -> tuple[datetime, datetime]:
+        """Get the earliest slot at or after the start time that fits in the workday.
+
+        Also skip past the occurrences of recurring events, those are queried only for the slot being checked.
+        """
+        while True:
+            end_time = start_time + timedelta(minutes=duration)
+            # The new event end time is after the workday, assign it to the next
+            # Compare with the workday of the start, the end can be on the next day.
+            if end_time > get_workday_end(start_time):
+                start_time = get_next_workday_start(start_time)
+                end_time = start_time + timedelta(minutes=duration)
+
+            occurrence = next(self.get_recurring_occurrences(start_time, end_time), None)
+            if occurrence is None:
+                return start_time, end_time
+            start_time = occurrence["end"]
+
+    def _get_loaded_overlapping_events(self, start_time: datetime, end_time: datetime) -> list[dict]:
+        """Get the events in existing_events which overlap the time between start and end."""
+        # An event can't be longer than a day, so an event starting a day before the start ends before it.
+        low = bisect.bisect_left(self.existing_events, start_time - timedelta(days=1), key=itemgetter("start"))
+        high = bisect.bisect_left(self.existing_events, end_time, key=itemgetter("start"))
+        return [event for event in self.existing_events[low:high] if event["end"] > start_time]
+
+    def _get_overlapping_events(self, start_time: datetime, end_time: datetime) -> list[dict]:
+        """Get the existing events which overlap the time between start and end.
+
+        Outside the window, existing_events only has the events placed in this batch, and the events of the day are
+        read from the db.
+        """
+        events = self._get_loaded_overlapping_events(start_time, end_time)
+        if not (self.window_start and self.window_start <= start_time < self.window_end):
+            day_start = datetime.combine(start_time.date(), time())
+            events.extend(
+                event for event in get_single_events(day_start, end_time).dicts() if event["end"] > start_time
+            )
+        return events
+
+    def _get_day_blocked_times(self, day: datetime) -> list[dict]:
+        """Get the existing events and the occurrences of the recurring events on the day, in order of start time."""
+        day_start = datetime.combine(day.date(), time())
+        day_end = day_start + timedelta(days=1)
+        events = self._get_overlapping_events(day_start, day_end)
+        events.extend(self.get_recurring_occurrences(day_start, day_end))
+        return sorted(events, key=itemgetter("start"))
+
+    def _get_free_time(self, start_time: datetime, duration: int) -> tuple[datetime, datetime]:
+        """Get the earliest slot at or after the start time that fits in the workday, and doesn't overlap any event.
+
+        Unlike `_get_free_slot`, the start time can be outside the workday and the existing events are skipped too.
+        The gaps are found a day at a time, so a full day costs one lookup instead of one for each event.
+        """
+        day = start_time
+        while True:
+            if day.isoweekday() <= 5:
+                for gap in get_day_gaps(self._get_day_blocked_times(day), day):
+                    start = max(gap["start"], start_time)
+                    end = start + timedelta(minutes=duration)
+                    if end <= gap["end"]:
+                        return start, end
+            day = get_next_workday_start(day)
+
     def schedule_next(self, last_event: dict, event_to_be_rescheduled: dict) -> dict:
         """Schedule the event after the last event."""
         duration = event_to_be_rescheduled.pop("duration")
-        start_time = last_event["end"]
-        end_time = last_event["end"] + timedelta(minutes=duration)
-        # The new event end time is after the workday, assign it to the next
-        if end_time > get_workday_end(end_time):
-            start_time = get_next_workday_start(end_time)
-            end_time = start_time + timedelta(minutes=duration)
+        start_time, end_time = self._get_free_slot(last_event["end"], duration)
 
         event_to_be_rescheduled["start"] = start_time
         event_to_be_rescheduled["end"] = end_time
@@ -142,12 +276,12 @@ class Scheduler:
         event_start = event["start"]
         event_end = event["end"]
 
-        # Check if event falls during the weekends
-        if event_start.date().isoweekday() > 5:
+        # Check if event falls during the weekends or outside the workday.
+        if is_outside_workdays(event):
             return True
 
-        # Check if the even falls outside the workday
-        if event_start < get_workday_start(event_start) or event_end > get_workday_end(event_end):
+        # Check if the event overlaps with any occurrence of the recurring events.
+        if next(self.get_recurring_occurrences(event_start, event_end), None):
             return True
 
         # Get the index of event whose start is just before the event start.
@@ -175,20 +309,21 @@ class Scheduler:
             # If the first event doesn't end at the workday end, add the gap between the event and workday end.
             workday_end = get_workday_end(event1["start"])
             duration = calculate_duration_minutes(event1["end"], workday_end)
-            if duration:
+            if duration > 0:
                 self.unscheduled_slots[duration].append({"start": event1["end"], "end": workday_end})
 
             # If the second doesn't start at the workday start, add the gap between the workday start and event start.
             workday_start = get_workday_start(event2["start"])
             duration = calculate_duration_minutes(workday_start, event2["start"])
 
-            if duration:
+            if duration > 0:
                 self.unscheduled_slots[duration].append({"start": workday_start, "end": event2["start"]})
 
         # If the events fall on the same date, add the gap between the events if there's any.
-        duration = calculate_duration_minutes(event1["end"], event2["start"])
-        if duration:
-            self.unscheduled_slots[duration].append({"start": event1["end"], "end": event2["start"]})
+        else:
+            duration = calculate_duration_minutes(event1["end"], event2["start"])
+            if duration > 0:
+                self.unscheduled_slots[duration].append({"start": event1["end"], "end": event2["start"]})
         return self.unscheduled_slots
 
     def reschedule_events(self):
@@ -201,7 +336,7 @@ class Scheduler:
             if duration in self.unscheduled_events:
                 relevant_slots = self.unscheduled_slots[duration]
                 for _ in range(len(relevant_slots)):
-                    if not self.unscheduled_events[duration]:
+                    if not self.unscheduled_events.get(duration):
                         continue
                     event_to_reschedule = self.unscheduled_events[duration].pop(0)
                     slot = relevant_slots.pop(0)
@@ -218,6 +353,94 @@ class Scheduler:
 
             self._clean_unassigned_slots(duration, sorted_slot_durations)
 
+    def is_prioritised(self) -> bool:
+        """Check if any event to be rescheduled has a priority or a latest end."""
+        return any(
+            event.get("priority") or event.get("latest_end")
+            for events in self.unscheduled_events.values()
+            for event in events
+        )
+
+    @staticmethod
+    def _pop_earliest_slot(duration: int, slot_queues: dict, sorted_slot_durations: list[int]) -> dict | None:
+        """Pop the earliest slot which is at least as long as the duration.
+
+        Slots are kept in a heap for each slot duration, only the first slot of each long enough duration is checked.
+        So a pop takes O(log n) for the heap, plus a scan of the distinct slot durations. A slot is never longer than a
+        day, so there are at most 1440 of those.
+        """
+        pivot = bisect.bisect_left(sorted_slot_durations, duration)
+        slot_durations = sorted_slot_durations[pivot:]
+        if not slot_durations:
+            return None
+        slot_duration = min(slot_durations, key=lambda d: slot_queues[d][0])
+        slot_start, slot_end = heapq.heappop(slot_queues[slot_duration])
+        if not slot_queues[slot_duration]:
+            slot_queues.pop(slot_duration)
+            sorted_slot_durations.remove(slot_duration)
+        return {"start": slot_start, "end": slot_end}
+
+    def _schedule_at_free_time(self, event: dict) -> dict:
+        """Schedule the event at the first free time at or after its start, from the same day on."""
+        event["start"], event["end"] = self._get_free_time(event["start"], event.pop("duration"))
+        self.scheduled_events.append(event)
+        return event
+
+    def _schedule_after(self, last_event: dict | None, event: dict) -> dict:
+        """Schedule the event after the last event, or at the first free time after its start if there is no event."""
+        if last_event:
+            return self.schedule_next(last_event, event)
+        return self._schedule_at_free_time(event)
+
+    def _reschedule_into_slot(
+        self, event: dict, slot: dict, slot_queues: dict[int, list], sorted_slot_durations: list[int]
+    ) -> dict:
+        """Reschedule the event to the slot, and add the time left in the slot back to the slots."""
+        event = self._reschedule(event, slot, calculate_duration_minutes(slot["start"], slot["end"]))
+        remaining_duration = calculate_duration_minutes(event["end"], slot["end"])
+        if remaining_duration:
+            if remaining_duration not in slot_queues:
+                slot_queues[remaining_duration] = []
+                bisect.insort(sorted_slot_durations, remaining_duration)
+            heapq.heappush(slot_queues[remaining_duration], (event["end"], slot["end"]))
+        return event
+
+    def reschedule_by_priority(self) -> None:
+        """Reschedule events in the order of priority, then latest end.
+
+        Events are taken from a priority queue, higher priority and earlier latest end first, then shorter duration.
+        Each event gets the earliest slot it fits in, or is scheduled after the last event if there is no such slot.
+        Events which end after their latest end are added to `missed_deadline_events`.
+        """
+        queue = [
+            (-event.get("priority", 0), event.get("latest_end") or datetime.max, duration, i, event)
+            for duration in self.unscheduled_event_durations
+            for i, event in enumerate(self.unscheduled_events[duration])
+        ]
+        heapq.heapify(queue)
+        slot_queues = {}
+        for duration, slots in self.unscheduled_slots.items():
+            if slots:
+                slot_queues[duration] = [(slot["start"], slot["end"]) for slot in slots]
+                heapq.heapify(slot_queues[duration])
+        sorted_slot_durations = sorted(slot_queues)
+        last_event = self._get_last_event()
+
+        while queue:
+            *_, duration, _, event = heapq.heappop(queue)
+            slot = self._pop_earliest_slot(duration, slot_queues, sorted_slot_durations)
+            if slot:
+                event = self._reschedule_into_slot(event, slot, slot_queues, sorted_slot_durations)
+                # Slots can be after the last event, before an occurrence, so the events left over go after this one.
+                last_event = max(last_event or event, event, key=itemgetter("end"))
+            else:
+                last_event = event = self._schedule_after(last_event, event)
+
+            if event.get("latest_end") and event["end"] > event["latest_end"]:
+                self.missed_deadline_events.append(event)
+        self.unscheduled_events.clear()
+        self.unscheduled_event_durations.clear()
+
     def assign_slots_to_shorter_events(self, slot_duration: int, sorted_slot_durations: list[int]) -> None:
         """Assign slot to events shorter than slot duration.
 
@@ -252,10 +475,121 @@ class Scheduler:
             self._add_remaining_time_to_unscheduled_slots(scheduled_event, slot, sorted_slot_durations)
             self._clean_unassigned_slots(slot_duration, sorted_slot_durations)
 
-    def schedule_events(self, new_events: list[dict]):
-        """Schedule all input events."""
-        # Sort input events based on start time.
-        sorted_new_events = sorted(new_events, key=lambda e: e["start"])
+    def _reschedule_occurrence(self, occurrence: dict, event: dict) -> None:
+        """Schedule the occurrence as a single event, at the earliest free time at or after its start."""
+        occurrence["requested_start"] = occurrence["start"]
+        occurrence["start"], occurrence["end"] = self._get_free_time(occurrence["start"], event["duration"])
+        if "priority" in event:
+            occurrence["priority"] = event["priority"]
+        self.scheduled_events.append(occurrence)
+        bisect.insort(self.existing_events, occurrence, key=itemgetter("start"))
+
+    @staticmethod
+    def _check_recurring_event(event: dict) -> None:
+        """Check that every occurrence of the rule is within the workday, on a weekday for a weekly rule.
+
+        The occurrences all have the time of the rule, so an occurrence outside the workday can't be moved on its own.
+        """
+        if event["end"] > get_workday_end(event["start"]) or event["start"] < get_workday_start(event["start"]):
+            raise ValidationError(f"Recurring events should be within the workday: {event['description']}")
+        if event["recurrence"] == "weekly" and event["start"].isoweekday() > 5:
+            raise ValidationError(f"Weekly events should be on a weekday: {event['description']}")
+
+    def _get_occurrences_to_reschedule(self, event: dict) -> list[dict]:
+        """Get the occurrences of the rule which overlap other events, up to the end of the rule.
+
+        The single events in the db are read in one query over the days of the rule, and streamed along the
+        occurrences. The events placed in this batch and the occurrences of the other rules are checked as well.
+        The weekend occurrences of a daily rule don't take any workday time, and are kept on the rule.
+        """
+        occurrences = (
+            occurrence
+            for occurrence in iter_occurrences(event, event["start"])
+            if not (event["recurrence"] == "daily" and occurrence["start"].isoweekday() > 5)
+        )
+        first_day = datetime.combine(event["start"].date(), time())
+        if event["recurrence_count"]:
+            last_day = get_occurrence_start(event, event["recurrence_count"] - 1).date()
+        else:
+            last_day = event["recurrence_until"]
+        db_events = get_single_events(first_day, datetime.combine(last_day, time()) + timedelta(days=1))
+        return [
+            occurrence
+            for occurrence, overlapping_events in iter_overlapping_events(occurrences, db_events.dicts().iterator())
+            if overlapping_events
+            or self._get_loaded_overlapping_events(occurrence["start"], occurrence["end"])
+            or next(self.get_recurring_occurrences(occurrence["start"], occurrence["end"]), None)
+        ]
+
+    def schedule_recurring_event(self, event: dict) -> None:
+        """Schedule a recurring event as a single rule.
+
+        Every occurrence is checked, up to the end of the rule. The occurrences which overlap other events are
+        cancelled on the rule and scheduled as single events, never before their own start.
+        Rules outside the workday, or weekly on a weekend, are rejected.
+        """
+        self._check_recurring_event(event)
+        event["id"] = uuid4()
+        occurrences_to_reschedule = self._get_occurrences_to_reschedule(event)
+        event["exdates"] = {occurrence["start"] for occurrence in occurrences_to_reschedule}
+        # Add the rule first, so that the occurrences are rescheduled past the other occurrences of the rule.
+        self.recurring_events.append(event)
+        self.scheduled_recurring_events.append(event)
+        for occurrence in occurrences_to_reschedule:
+            self._reschedule_occurrence(occurrence, event)
+
+    def _get_blocked_times(self, prioritised: bool = False) -> Iterator[dict]:
+        """Merge the existing events with the occurrences of the recurring events, in ascending order of start time.
+
+        The occurrences are generated lazily in the window, while the slots are being found. Only the time of the
+        occurrences within the workday is blocked, weekend occurrences don't take any workday time and are left out.
+        The events outside the window aren't read. If there are any, an empty event at the edge of the window stands in
+        for them, so that the gaps at the start of the first day and at the end of the last day are found.
+        Prioritised events get the earliest slots, so the gap at the start of the first day is found for them even if
+        there are no earlier events.
+        """
+        window = (self.window_start, self.window_end)
+        occurrences = [
+            filter(None, map(clip_to_workday, iter_occurrences(event, *window, event["exdates"])))
+            for event in self.recurring_events
+        ]
+        low = bisect.bisect_left(self.existing_events, self.window_start, key=itemgetter("start"))
+        high = bisect.bisect_left(self.existing_events, self.window_end, key=itemgetter("start"))
+        blocked_times = heapq.merge(self.existing_events[low:high], *occurrences, key=itemgetter("start"))
+        if prioritised or get_last_single_event(self.window_start):
+            day_end = get_workday_end(self.window_start - timedelta(days=1))
+            blocked_times = chain([{"start": day_end, "end": day_end}], blocked_times)
+        if get_first_single_event(self.window_end):
+            day_start = get_workday_start(self.window_end)
+            blocked_times = chain(blocked_times, [{"start": day_start, "end": day_start}])
+        return blocked_times
+
+    def _get_single_events(self, new_events: list[dict]) -> list[dict]:
+        """Schedule the recurring events and return the single events.
+
+        The recurring events are scheduled first, so that the single events are checked against their occurrences.
+        """
+        for event in new_events:
+            if event.get("recurrence"):
+                self.schedule_recurring_event(event)
+        return [event for event in new_events if not event.get("recurrence")]
+
+    def _set_window(self, new_events: list[dict]) -> None:
+        """Set the window to the days asked for by the new events, and read the single events in it.
+
+        With sharding, only the tables of the months in the window are read, and the latest one for the last event.
+        """
+        self.window_start = datetime.combine(min(event["start"] for event in new_events).date(), time())
+        last_day = max(event["end"] for event in new_events).date()
+        self.window_end = datetime.combine(last_day, time()) + timedelta(days=1)
+        self.existing_events = list(get_single_events(self.window_start, self.window_end).dicts())
+        self.last_event = get_last_single_event()
+
+    def split_new_events(self, sorted_new_events: list[dict]) -> None:
+        """Schedule the events which don't need rescheduling and add the rest to unscheduled_events."""
+        if self.engine == "numpy":
+            self._split_new_events_vectorised(sorted_new_events)
+            return
 
         for event in sorted_new_events:
             # If event needs rescheduling add it to unscheduled_events, to be scheduled later.
@@ -268,18 +602,63 @@ class Scheduler:
                 self.scheduled_events.append(event)
                 bisect.insort(self.existing_events, event, key=lambda x: x["start"])
 
+    def _split_new_events_vectorised(self, sorted_new_events: list[dict]) -> None:
+        """Split the new events like `split_new_events`, checking the whole batch with numpy at once.
+
+        The accepted events are merged into existing_events in one pass, instead of being inserted one by one.
+        """
+        from src.vectorised import get_rescheduling_flags
+
+        occurrences = ()
+        if sorted_new_events:
+            window_end = max(event["end"] for event in sorted_new_events)
+            occurrences = self.get_recurring_occurrences(sorted_new_events[0]["start"], window_end)
+        flags = get_rescheduling_flags(self.existing_events, sorted_new_events, occurrences)
+
+        accepted_events = []
+        for event, needs_rescheduling in zip(sorted_new_events, flags.tolist(), strict=True):
+            if needs_rescheduling:
+                self.update_unscheduled_events(event)
+            else:
+                event.pop("duration")
+                accepted_events.append(event)
+        self.scheduled_events.extend(accepted_events)
+        # Same order as inserting one by one, accepted events go after the existing events with the same start.
+        self.existing_events = list(heapq.merge(self.existing_events, accepted_events, key=itemgetter("start")))
+
+    def schedule_events(self, new_events: list[dict]):
+        """Schedule all input events.
+
+        The same scheduler can schedule several batches, and delete or move events between them.
+        """
+        if not new_events:
+            return
+        self._reset_batch()
+        self._set_window(new_events)
+        # Sort input events based on start time.
+        sorted_new_events = sorted(self._get_single_events(new_events), key=lambda e: e["start"])
+        self.split_new_events(sorted_new_events)
+
         # If there is no unscheduled_events, persist the scheduled events.
         if not self.unscheduled_events:
             self.persist_new_events()
             return
 
         # if there are unscheduled events, then find available slots between events.
-        for i, event in enumerate(self.existing_events):
-            if self.unscheduled_events and i < len(self.existing_events) - 1:
-                next_event = self.existing_events[i + 1]
-                self.update_unscheduled_slots(event, next_event)
-                # If we reschedule here, we will iterate less but might waste a few slot.
-                # self.reschedule_events()
+        prioritised = self.is_prioritised()
+        last_ending_event = None
+        for event, next_event in pairwise(self._get_blocked_times(prioritised)):
+            # Events within an earlier, longer event don't free any time, find the gap after the event ending last.
+            if last_ending_event is None or event["end"] > last_ending_event["end"]:
+                last_ending_event = event
+            self.update_unscheduled_slots(last_ending_event, next_event)
+            # If we reschedule here, we will iterate less but might waste a few slot.
+            # self.reschedule_events()
+
+        if prioritised:
+            self.reschedule_by_priority()
+            self.persist_new_events()
+            return
 
         # If we reschedule here, we will iterate over all the slots but will be the most efficient use of time.
         self.reschedule_events()
@@ -297,3 +676,158 @@ class Scheduler:
 
         # Persist the new events in the DB.
         self.persist_new_events()
+
+    def _remove_existing_event(self, event: dict) -> None:
+        """Remove the event from existing_events, if it's there."""
+        index = bisect.bisect_left(self.existing_events, event["start"], key=itemgetter("start"))
+        while index < len(self.existing_events) and self.existing_events[index]["start"] == event["start"]:
+            if self.existing_events[index].get("id") == event["id"]:
+                del self.existing_events[index]
+                return
+            index += 1
+
+    def _add_existing_event(self, event: dict) -> None:
+        """Add the event to existing_events, if it's in the window which has been read."""
+        if self.window_start and self.window_start <= event["start"] < self.window_end:
+            bisect.insort(self.existing_events, event, key=itemgetter("start"))
+
+    def _get_day_events(self, day: datetime) -> list[dict]:
+        return get_day_events(day, self.recurring_events)
+
+    def _update_day_slots(self, old_gaps: list[dict], new_gaps: list[dict]) -> None:
+        """Update unscheduled_slots with the changes to the gaps of a day.
+
+        Only the slots of the day are touched. The slots are updated only if they have already been found.
+        """
+        if not self.unscheduled_slots:
+            return
+
+        for gap in old_gaps:
+            duration = calculate_duration_minutes(gap["start"], gap["end"])
+            if gap not in new_gaps and gap in self.unscheduled_slots.get(duration, []):
+                self.unscheduled_slots[duration].remove(gap)
+                if not self.unscheduled_slots[duration]:
+                    self.unscheduled_slots.pop(duration)
+        for gap in new_gaps:
+            if gap not in old_gaps:
+                self.unscheduled_slots[calculate_duration_minutes(gap["start"], gap["end"])].append(gap)
+
+    def _move(self, event: dict, start: datetime, requested_start: datetime | None) -> tuple[dict, list[dict]]:
+        """Move the event to the start, in the db and in existing_events, and update the slots of the affected days.
+
+        Only the events of the day the event is moved from and of the day it's moved to are read.
+        Return the moved event and the new gaps of the day it was moved from.
+        """
+        moved_event = {**event, "start": start, "end": start + (event["end"] - event["start"])}
+        moved_event["requested_start"] = requested_start
+        # The day the event is moved from first, it's the same day if the event is moved within the day.
+        days = [event["start"]] if event["start"].date() == start.date() else [event["start"], start]
+        day_gaps = []
+        for day in days:
+            day_events = self._get_day_events(day)
+            moved_day_events = [day_event for day_event in day_events if day_event.get("id") != event["id"]]
+            if day.date() == start.date():
+                bisect.insort(moved_day_events, moved_event, key=itemgetter("start"))
+            day_gaps.append(get_day_gaps(moved_day_events, day))
+            self._update_day_slots(get_day_gaps(day_events, day), day_gaps[-1])
+
+        update_single_event(event, moved_event)
+        self._remove_existing_event(event)
+        self._add_existing_event(moved_event)
+        return moved_event, day_gaps[0]
+
+    def _pull_events_earlier(self, gap: dict) -> list[dict]:
+        """Move events which were pushed later when scheduling into the gap, but not before their requested start.
+
+        Events asked for on the day of the gap, before its end, and scheduled after it are pulled, higher priority and
+        then earlier requested start first. An event right after the gap can also be moved into its own time.
+        The time the other events free isn't filled again.
+        """
+        pulled_events = []
+        gap_start, gap_end = gap["start"], gap["end"]
+        day_start = datetime.combine(gap_start.date(), time())
+        candidates = (
+            select_events(
+                lambda model: model.select().where(
+                    model.recurrence.is_null()
+                    & (model.requested_start >= day_start)
+                    & (model.requested_start < gap["end"])
+                    & (model.start >= gap["end"])
+                ),
+                start=gap["end"],
+                recurring=False,
+                order_by=lambda model: (model.priority.desc(), model.requested_start),
+            )
+            .dicts()
+        )
+        for candidate in candidates.iterator():
+            if calculate_duration_minutes(gap_start, gap_end) < 5:
+                break
+            start = max(gap_start, candidate["requested_start"])
+            end = start + (candidate["end"] - candidate["start"])
+            if end <= gap_end or (candidate["start"] == gap_end and end <= candidate["end"]):
+                pulled_events.append((candidate, start))
+                # The time of an event right after the gap is freed by its move.
+                if candidate["start"] == gap_end:
+                    gap_end = candidate["end"]
+                gap_start = end
+
+        # The events are moved after reading the candidates, so that the query doesn't see the moved events.
+        # The requested start is kept if the event still starts after it.
+        return [
+            self._move(event, start, event["requested_start"] if start > event["requested_start"] else None)[0]
+            for event, start in pulled_events
+        ]
+
+    def _pull_events_into_freed_time(self, day_gaps: list[dict], freed_start: datetime) -> list[dict]:
+        """Pull events earlier into the gap of the day which has the freed time."""
+        freed_gap = next((gap for gap in day_gaps if gap["start"] <= freed_start < gap["end"]), None)
+        return self._pull_events_earlier(freed_gap) if freed_gap else []
+
+    def delete_event(self, event_id, pull_earlier: bool = False) -> list[dict]:
+        """Delete the event and free its time.
+
+        The freed time is merged with the gaps around it, reading only the events of the day of the event.
+        If `pull_earlier` is set, events which were pushed later when scheduling are moved into the freed gap.
+        Return the events which were pulled earlier.
+
+        Deleting a recurring event deletes all its occurrences.
+        """
+        event = get_event(event_id)
+        if event["recurrence"]:
+            RecurrenceException.delete().where(RecurrenceException.event == event["id"]).execute()
+            Event.delete_by_id(event["id"])
+            self.recurring_events = [rule for rule in self.recurring_events if rule["id"] != event["id"]]
+            return []
+
+        day_events = self._get_day_events(event["start"])
+        other_events = [day_event for day_event in day_events if day_event.get("id") != event["id"]]
+        gaps = get_day_gaps(other_events, event["start"])
+        get_single_event_model(event["start"]).delete_by_id(event["id"])
+        self._remove_existing_event(event)
+        self._update_day_slots(get_day_gaps(day_events, event["start"]), gaps)
+        if not pull_earlier:
+            return []
+        return self._pull_events_into_freed_time(gaps, event["start"])
+
+    def move_event(self, event_id, start: datetime, pull_earlier: bool = False) -> list[dict]:
+        """Move the event to the start, keeping its duration.
+
+        The event should still fall on a weekday within the workday and shouldn't overlap any other event.
+        If `pull_earlier` is set, events which were pushed later when scheduling are moved into the freed gap.
+        Return the events which were pulled earlier.
+        """
+        event = get_event(event_id)
+        if event["recurrence"]:
+            raise ValidationError(f"Recurring events can't be moved: {event['description']}")
+        end = start + (event["end"] - event["start"])
+        if start.isoweekday() > 5 or start < get_workday_start(start) or end > get_workday_end(start):
+            raise ValidationError(f"Events can only be moved within the workday on weekdays: {event['description']}")
+        for day_event in self._get_day_events(start):
+            if day_event.get("id") != event["id"] and day_event["start"] < end and start < day_event["end"]:
+                raise ValidationError(f"Event would overlap {day_event['description']}: {event['description']}")
+
+        _, gaps = self._move(event, start, None)
+        if not pull_earlier:
+            return []
+        return self._pull_events_into_freed_time(gaps, event["start"])
@@ -0,0 +1,229 @@
+"""Route the reads and writes of events to the tables they're stored in.
+
+By default all the events are stored in the `event` table. With `SHARD_EVENTS_BY_MONTH`, single events are stored in a
+table for the month they start in, `event_YYYY_MM`, which is created when the first event of the month is saved.
+Reads only query the tables of the months in the requested window, and each table keeps its indexes small.
+Recurring events span many months, they stay in the `event` table.
+
+The monthly tables are created from the model, and migrations only change the `event` table. After a migration which
+adds or removes columns, run `python -m src.storage` to apply the change to the monthly tables as well.
+"""
+import operator
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime
+from functools import reduce
+
+from peewee import Field, ModelSelect, SelectQuery
+from playhouse.migrate import SchemaMigrator, migrate
+
+from models.event import Event
+from src.config import SHARD_EVENTS_BY_MONTH
+from src.exceptions import ValidationError
+
+SHARD_TABLE_FORMAT = "event_%Y_%m"
+SHARD_TABLE_PATTERN = re.compile(r"event_(\d{4})_(\d{2})")
+
+_shard_models = {}
+
+
+def get_month(value: datetime) -> datetime:
+    """Get the start of the month of the datetime."""
+    return datetime(value.year, value.month, 1)
+
+
+def _get_next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_shard_model(month: datetime) -> type[Event]:
+    """Get the model of the table storing the single events starting in the month."""
+    if month not in _shard_models:
+        meta = type("Meta", (), {"table_name": month.strftime(SHARD_TABLE_FORMAT)})
+        _shard_models[month] = type(f"Event{month:%Y%m}", (Event,), {"Meta": meta, "__module__": __name__})
+    model = _shard_models[month]
+    # Follow the db of the event table, in case it has been bound to another db since the model was defined.
+    if model._meta.database is not Event._meta.database:
+        model.bind(Event._meta.database)
+    return model
+
+
+def get_shard_months() -> list[datetime]:
+    """Get the months which have a table, in ascending order."""
+    months = []
+    for table in Event._meta.database.get_tables():
+        if match := SHARD_TABLE_PATTERN.fullmatch(table):
+            months.append(datetime(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def get_event_models(
+    start: datetime | None = None, end: datetime | None = None, recurring: bool = True
+) -> list[type[Event]]:
+    """Get the models of the tables storing the events which start in the window, in ascending order of month.
+
+    With sharding, the `event` table only has recurring events and is left out if they're not needed.
+    """
+    if not SHARD_EVENTS_BY_MONTH:
+        return [Event]
+    models = [
+        get_shard_model(month)
+        for month in get_shard_months()
+        if (start is None or _get_next_month(month) > start) and (end is None or month < end)
+    ]
+    # A query needs at least one table, the `event` table has no single events to add.
+    if recurring or not models:
+        models.insert(0, Event)
+    return models
+
+
+def select_events(
+    build_query: Callable[[type[Event]], ModelSelect],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    recurring: bool = True,
+    order_by: Callable[[type[Event]], tuple] = lambda model: (model.start,),
+) -> SelectQuery:
+    """Build the query for each table storing events which start in the window, and combine them with UNION ALL.
+
+    The combined query is ordered by the fields returned by `order_by`, by default in ascending order of start time.
+    It can be iterated like the query of a single table, but can't be filtered anymore.
+    """
+    models = get_event_models(start, end, recurring)
+    query = reduce(operator.add, (build_query(model) for model in models))
+    # A combined query is ordered by column names, but a query of a single table needs the fields of its model.
+    return query.order_by(*order_by(models[0]))
+
+
+def get_single_event_model(start: datetime) -> type[Event]:
+    """Get the model of the table storing the single event starting at the start."""
+    return get_shard_model(get_month(start)) if SHARD_EVENTS_BY_MONTH else Event
+
+
+def _create_single_event_model(start: datetime) -> type[Event]:
+    """Get the model of the table to save a single event starting at the start to, creating the table if needed."""
+    model = get_single_event_model(start)
+    if SHARD_EVENTS_BY_MONTH:
+        model.create_table(safe=True)
+    return model
+
+
+def get_event(event_id) -> dict:
+    """Get the event with the id, from any of the tables."""
+    for model in get_event_models():
+        if event := model.select().where(model.id == event_id).dicts().first():
+            return event
+    raise Event.DoesNotExist(f"Event not found: {event_id}")
+
+
+def get_first_single_event(start: datetime) -> dict | None:
+    """Get the single event starting first at or after the start.
+
+    With sharding, the tables are read from the month of the start on, until one has an event.
+    """
+    for model in get_event_models(start, recurring=False):
+        query = model.select().where(model.recurrence.is_null() & (model.start >= start))
+        if event := query.order_by(model.start).dicts().first():
+            return event
+    return None
+
+
+def get_last_single_event(end: datetime | None = None) -> dict | None:
+    """Get the single event ending last, of the events starting before the end if given.
+
+    With sharding, the tables are read from the latest month back, until one has an event. Events don't run past
+    midnight, so the table with the latest events also has the event ending last.
+    """
+    for model in reversed(get_event_models(end=end, recurring=False)):
+        query = model.select().where(model.recurrence.is_null())
+        if end:
+            query = query.where(model.start < end)
+        if event := query.order_by(model.end.desc()).dicts().first():
+            return event
+    return None
+
+
+def insert_single_events(events: list[dict], fields: list[Field]):
+    """Save the single events, with sharding the events of each month are saved to the table of the month."""
+    events_by_model = defaultdict(list)
+    for event in events:
+        events_by_model[get_single_event_model(event["start"])].append(event)
+    for model_events in events_by_model.values():
+        model = _create_single_event_model(model_events[0]["start"])
+        model.insert_many(model_events, fields=[model._meta.fields[field.name] for field in fields]).execute()
+
+
+def update_single_event(event: dict, moved_event: dict):
+    """Save the start, end and requested start of the moved event.
+
+    With sharding, an event moved to another month is moved to the table of that month.
+    """
+    model = get_single_event_model(event["start"])
+    moved_model = _create_single_event_model(moved_event["start"])
+    if moved_model is model:
+        model.update(
+            start=moved_event["start"], end=moved_event["end"], requested_start=moved_event["requested_start"]
+        ).where(model.id == event["id"]).execute()
+        return
+    with Event._meta.database.atomic():
+        model.delete_by_id(event["id"])
+        moved_model.insert({field: moved_event[field] for field in moved_model._meta.fields}).execute()
+
+
+def shard_events():
+    """Move the single events from the `event` table to the table of their month, a month at a time.
+
+    Run this once after enabling sharding on a db with events.
+    """
+    if not SHARD_EVENTS_BY_MONTH:
+        raise ValidationError("Enable sharding with SHARD_EVENTS_BY_MONTH=true before moving the events")
+    query = Event.select().where(Event.recurrence.is_null())
+    first_event = query.order_by(Event.start).first()
+    if first_event is None:
+        return
+    last_event = query.order_by(Event.start.desc()).first()
+
+    month = get_month(first_event.start)
+    while month <= last_event.start:
+        next_month = _get_next_month(month)
+        month_query = query.where((Event.start >= month) & (Event.start < next_month))
+        if not month_query.exists():
+            month = next_month
+            continue
+        model = get_shard_model(month)
+        with Event._meta.database.atomic():
+            model.create_table(safe=True)
+            model.insert_from(month_query, list(model._meta.sorted_fields)).execute()
+            Event.delete().where(
+                Event.recurrence.is_null() & (Event.start >= month) & (Event.start < next_month)
+            ).execute()
+        month = next_month
+
+
+def migrate_shards():
+    """Add the columns of the model missing from the monthly tables, and drop the columns not in it anymore.
+
+    The indexes of the model are created as well. Other changes, like a new column type, aren't applied.
+    """
+    database = Event._meta.database
+    schema_migrator = SchemaMigrator.from_database(database)
+    for month in get_shard_months():
+        model = get_shard_model(month)
+        table = model._meta.table_name
+        columns = {column.name for column in database.get_columns(table)}
+        fields = {field.column_name: field for field in model._meta.sorted_fields}
+        operations = [schema_migrator.add_column(table, name, fields[name]) for name in fields.keys() - columns]
+        operations += [schema_migrator.drop_column(table, name) for name in columns - fields.keys()]
+        with database.atomic():
+            migrate(*operations)
+            model.create_table(safe=True)
+
+
+if __name__ == "__main__":
+    try:
+        migrate_shards()
+        shard_events()
+    except ValidationError as e:
+        sys.exit(e)
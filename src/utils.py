@@ -1,8 +1,15 @@
-from datetime import datetime, timedelta
+import sys
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import datetime, time, timedelta
+from operator import itemgetter
 
-from peewee import ModelSelect
+from peewee import ModelSelect, SelectQuery
 
-from models.event import Event
+from models.event import Event, RecurrenceException
+from src.constants import DATE_FORMAT
+from src.recurrence import iter_occurrences
+from src.storage import select_events
 
 
 def display_all_events():
@@ -11,9 +18,76 @@ def display_all_events():
         print(event)
 
 
-def get_all_events() -> ModelSelect:
-    """Get all events from the db in ascending order of start time."""
-    return Event.select().order_by(Event.start)
+def display_missed_deadline_events(events: list[dict]):
+    """Display the events which end after their latest end on stderr."""
+    for event in events:
+        print(f"Missed latest end {event['latest_end'].strftime(DATE_FORMAT)}: {Event(**event)}", file=sys.stderr)
+
+
+def _select_window(model: type[Event], start: datetime | None, end: datetime | None) -> ModelSelect:
+    query = model.select()
+    if start:
+        query = query.where(model.start >= start)
+    if end:
+        query = query.where(model.start < end)
+    return query
+
+
+def get_all_events(start: datetime | None = None, end: datetime | None = None) -> SelectQuery:
+    """Get all events from the db, starting between start and end if given, in ascending order of start time.
+
+    With sharding, only the tables of the months between start and end are read.
+    """
+    return select_events(lambda model: _select_window(model, start, end), start, end)
+
+
+def get_single_events(start: datetime | None = None, end: datetime | None = None) -> SelectQuery:
+    """Get all non-recurring events from the db, starting between start and end if given, ordered by start time."""
+    return select_events(
+        lambda model: _select_window(model, start, end).where(model.recurrence.is_null()), start, end, recurring=False
+    )
+
+
+def get_recurring_events() -> list[dict]:
+    """Get all recurring events from the db, along with the starts of their cancelled occurrences as `exdates`."""
+    exdates = defaultdict(set)
+    for event_id, occurrence in RecurrenceException.select(
+        RecurrenceException.event, RecurrenceException.occurrence
+    ).tuples():
+        exdates[event_id].add(occurrence)
+
+    # Recurring events are always in the event table.
+    events = list(Event.select().where(Event.recurrence.is_null(False)).order_by(Event.start).dicts())
+    for event in events:
+        event["exdates"] = exdates[event["id"]]
+    return events
+
+
+def get_day_events(day: datetime, recurring_events: list[dict]) -> list[dict]:
+    """Get the single events and the occurrences of the recurring events on the day, in ascending order of start time.
+
+    Only the single events of the day are read, the recurring events are passed in as they're already loaded.
+    """
+    day_start = datetime.combine(day.date(), time())
+    day_end = day_start + timedelta(days=1)
+    events = list(get_single_events(day_start, day_end).dicts())
+    for event in recurring_events:
+        events.extend(iter_occurrences(event, day_start, day_end, event["exdates"]))
+    return sorted(events, key=itemgetter("start"))
+
+
+def get_day_gaps(day_events: list[dict], day: datetime) -> list[dict]:
+    """Get the free time in the workday between the events of the day."""
+    gaps = []
+    gap_start = get_workday_start(day)
+    workday_end = get_workday_end(day)
+    for event in day_events:
+        if min(event["start"], workday_end) > gap_start:
+            gaps.append({"start": gap_start, "end": min(event["start"], workday_end)})
+        gap_start = max(gap_start, event["end"])
+    if workday_end > gap_start:
+        gaps.append({"start": gap_start, "end": workday_end})
+    return gaps
 
 
 def get_workday_start(workday: datetime) -> datetime:
@@ -33,6 +107,42 @@ def get_next_workday_start(workday: datetime) -> datetime:
     return workday + timedelta(days=day_increment)
 
 
+def is_outside_workdays(event: dict) -> bool:
+    """Check if the event is on a weekend or outside the workday of the day it starts."""
+    return (
+        event["start"].isoweekday() > 5
+        or event["start"] < get_workday_start(event["start"])
+        or event["end"] > get_workday_end(event["start"])
+    )
+
+
+def clip_to_workday(event: dict) -> dict | None:
+    """Get the part of the event within the workday of its day, or None on a weekend or outside the workday."""
+    start = max(event["start"], get_workday_start(event["start"]))
+    end = min(event["end"], get_workday_end(event["start"]))
+    if event["start"].isoweekday() > 5 or start >= end:
+        return None
+    return {**event, "start": start, "end": end}
+
+
+def iter_overlapping_events(items: Iterable[dict], events: Iterable[dict]) -> Iterator[tuple[dict, list[dict]]]:
+    """Pair each item with the events overlapping it, both should be in ascending order of start time.
+
+    The events are read along the items, so they can be streamed from the db. Events don't run past midnight, only the
+    events starting on the day of an item are kept.
+    """
+    events = iter(events)
+    next_event = next(events, None)
+    day_events = []
+    for item in items:
+        while next_event is not None and next_event["start"] < item["end"]:
+            day_events.append(next_event)
+            next_event = next(events, None)
+        day_start = datetime.combine(item["start"].date(), time())
+        day_events = [event for event in day_events if event["start"] >= day_start]
+        yield item, [event for event in day_events if event["end"] > item["start"]]
+
+
 def calculate_duration_minutes(start_time, end_time) -> int:
     """Calculate the duration in minutes."""
     duration = end_time - start_time
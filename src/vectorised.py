@@ -0,0 +1,140 @@
+"""Vectorised version of `Scheduler.needs_rescheduling`, for very large batches.
+
+Needs numpy, which is only a dev dependency, installed with `poetry install --with dev`.
+"""
+from collections.abc import Iterable
+from datetime import date, datetime
+
+import numpy as np
+
+MINUTES_IN_DAY = 24 * 60
+WORKDAY_START_MINUTE = 9 * 60
+WORKDAY_END_MINUTE = 18 * 60
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_minutes(datetimes: Iterable[datetime]) -> np.ndarray:
+    """Convert datetimes to an int64 array of minutes since the epoch.
+
+    Building the minutes from the ordinal is a few times faster than numpy's conversion of datetime objects.
+    """
+    minutes = np.fromiter(
+        (dt.toordinal() * MINUTES_IN_DAY + dt.hour * 60 + dt.minute for dt in datetimes), dtype=np.int64
+    )
+    return minutes - EPOCH_ORDINAL * MINUTES_IN_DAY
+
+
+def is_overlapping(starts1: np.ndarray, ends1: np.ndarray, starts2: np.ndarray, ends2: np.ndarray) -> np.ndarray:
+    """Vectorised `Scheduler.is_overlapping`."""
+    return (
+        ((starts1 > starts2) & (ends1 < ends2))
+        | ((starts1 < starts2) & (ends1 > ends2))
+        | (ends1 > starts2)
+        | (ends2 < starts1)
+    )
+
+
+def _is_outside_workdays(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Check if the events fall on the weekends or outside the workday."""
+    # The epoch is a Thursday, so (days + 3) % 7 is 0 on Mondays.
+    is_weekend = (starts // MINUTES_IN_DAY + 3) % 7 >= 5
+    # Compare with the workday of the start, the end can be on the next day.
+    day_starts = starts - starts % MINUTES_IN_DAY
+    return (
+        is_weekend
+        | (starts - day_starts < WORKDAY_START_MINUTE)
+        | (ends - day_starts > WORKDAY_END_MINUTE)
+    )
+
+
+def _overlaps_occurrences(starts: np.ndarray, ends: np.ndarray, occurrences: Iterable[dict]) -> np.ndarray:
+    """Check if the events overlap with any of the occurrences."""
+    occurrences = sorted(occurrences, key=lambda occurrence: occurrence["start"])
+    if not occurrences:
+        return np.zeros(len(starts), dtype=bool)
+    occurrence_starts = to_minutes(occurrence["start"] for occurrence in occurrences)
+    # Occurrences of different recurring events can overlap, so compare with the latest end so far.
+    latest_occurrence_ends = np.maximum.accumulate(to_minutes(occurrence["end"] for occurrence in occurrences))
+    # Index of the last occurrence starting before the event end.
+    pivots = np.searchsorted(occurrence_starts, ends, side="left") - 1
+    return (pivots >= 0) & (latest_occurrence_ends[np.maximum(pivots, 0)] > starts)
+
+
+def _overlaps_existing_events(
+    starts: np.ndarray, ends: np.ndarray, existing_starts: np.ndarray, existing_ends: np.ndarray
+) -> np.ndarray:
+    """Check the overlap with the existing events the same way `Scheduler.needs_rescheduling` does.
+
+    That is, with the existing event at the index where the event start would be inserted and with the one after it.
+    """
+    overlaps = np.zeros(len(starts), dtype=bool)
+    if not len(existing_starts):
+        return overlaps
+    pivots = np.searchsorted(existing_starts, starts, side="left")
+    last_index = len(existing_starts) - 1
+    for indexes, is_after in ((pivots, False), (pivots + 1, True)):
+        in_range = indexes <= last_index
+        indexes = np.minimum(indexes, last_index)
+        other_starts, other_ends = existing_starts[indexes], existing_ends[indexes]
+        if is_after:
+            overlaps |= in_range & is_overlapping(starts, ends, other_starts, other_ends)
+        else:
+            overlaps |= in_range & is_overlapping(other_starts, other_ends, starts, ends)
+    return overlaps
+
+
+def _recheck_equal_starts(
+    flags: np.ndarray,
+    outside_flags: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    existing_starts: np.ndarray,
+    existing_ends: np.ndarray,
+) -> None:
+    """Recheck the events which start at the same time as an earlier event of the batch.
+
+    The python engine inserts every accepted event into existing_events before checking the next one. As the batch is
+    sorted on start, that only changes the check for events whose start matches an accepted event.
+    There are only a few such events, so they are rechecked one by one.
+    """
+    pivots = np.searchsorted(existing_starts, starts, side="left")
+    equal_start_ends = np.searchsorted(existing_starts, starts, side="right")
+    group_starts = np.searchsorted(starts, starts, side="left")
+    for i in np.flatnonzero(starts[1:] == starts[:-1]) + 1:
+        group_start = group_starts[i]
+        accepted = np.flatnonzero(~flags[group_start:i])[:2] + group_start
+        if not len(accepted):
+            continue
+        pivot, equal_start_end = pivots[i], equal_start_ends[i]
+        # Accepted events are inserted after the existing events with the same start, only the first two matter.
+        following = [
+            *zip(existing_starts[pivot:equal_start_end][:2], existing_ends[pivot:equal_start_end][:2], strict=True),
+            *zip(starts[accepted], ends[accepted], strict=True),
+            *zip(existing_starts[equal_start_end:][:2], existing_ends[equal_start_end:][:2], strict=True),
+        ][:2]
+        earlier, later = following[0], following[1] if len(following) > 1 else None
+        flags[i] = (
+            outside_flags[i]
+            or is_overlapping(earlier[0], earlier[1], starts[i], ends[i])
+            or (later is not None and is_overlapping(starts[i], ends[i], later[0], later[1]))
+        )
+
+
+def get_rescheduling_flags(
+    existing_events: list[dict], new_events: list[dict], occurrences: Iterable[dict] = ()
+) -> np.ndarray:
+    """Check if each of the new events needs rescheduling, for the whole batch at once.
+
+    Gives the same result as calling `Scheduler.needs_rescheduling` on the new events one by one, in ascending order
+    of start time, and adding each accepted event to existing_events.
+    Both `existing_events` and `new_events` should be sorted on start time.
+    """
+    starts = to_minutes(event["start"] for event in new_events)
+    ends = to_minutes(event["end"] for event in new_events)
+    existing_starts = to_minutes(event["start"] for event in existing_events)
+    existing_ends = to_minutes(event["end"] for event in existing_events)
+
+    outside_flags = _is_outside_workdays(starts, ends) | _overlaps_occurrences(starts, ends, occurrences)
+    flags = outside_flags | _overlaps_existing_events(starts, ends, existing_starts, existing_ends)
+    _recheck_equal_starts(flags, outside_flags, starts, ends, existing_starts, existing_ends)
+    return flags
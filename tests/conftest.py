@@ -2,9 +2,9 @@ import pytest
 from _pytest.fixtures import fixture
 from peewee import SqliteDatabase
 
-from models.event import Event
+from models.event import Event, RecurrenceException
 
-MODELS = [Event]
+MODELS = [Event, RecurrenceException]
 
 
 @fixture(autouse=True, scope="session")
@@ -20,4 +20,5 @@ def my_fixture():
 @pytest.fixture()
 def db():
     yield
-    Event.delete()
+    RecurrenceException.delete().execute()
+    Event.delete().execute()
@@ -0,0 +1,154 @@
+import csv
+import gzip
+import json
+import re
+from datetime import date, datetime
+
+import pytest
+
+from models.event import Event, RecurrenceException
+from src.exceptions import ValidationError
+from src.export import _fold_ics_line, export_events
+
+
+@pytest.fixture()
+def events(db):
+    Event.insert_many(
+        [
+            {
+                "id": "00000000-0000-0000-0000-000000000001",
+                "description": "Meet Jamie, for coffee",
+                "start": _get_dt("2022/08/23 15:00"),
+                "end": _get_dt("2022/08/23 16:00"),
+                "priority": 2,
+            },
+            {
+                "id": "00000000-0000-0000-0000-000000000002",
+                "description": "Guitar lessons",
+                "start": _get_dt("2022/08/24 16:15"),
+                "end": _get_dt("2022/08/24 17:00"),
+            },
+        ]
+    ).execute()
+    Event.create(
+        id="00000000-0000-0000-0000-000000000003",
+        description="Standup",
+        start=_get_dt("2022/08/20 10:00"),
+        end=_get_dt("2022/08/20 10:15"),
+        recurrence="weekdays",
+        recurrence_until=date(2022, 12, 31),
+    )
+    RecurrenceException.create(event="00000000-0000-0000-0000-000000000003", occurrence=_get_dt("2022/08/23 10:00"))
+
+
+def test_export_events_csv(events, tmp_path):
+    path = tmp_path / "events.csv"
+
+    count = export_events(str(path), "csv")
+
+    assert count == 3
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["description"] for row in rows] == ["Standup", "Meet Jamie, for coffee", "Guitar lessons"]
+    assert rows[1]["start"] == "2022-08-23 15:00:00"
+    assert rows[1]["priority"] == "2"
+    assert rows[1]["latest_end"] == ""
+
+
+def test_export_events_jsonl_gzip(events, tmp_path):
+    path = tmp_path / "events.jsonl.gz"
+
+    count = export_events(str(path), "jsonl", compress=True)
+
+    assert count == 3
+    with gzip.open(path, "rt") as file:
+        rows = [json.loads(line) for line in file]
+    assert rows[0]["recurrence"] == "weekdays"
+    assert rows[0]["recurrence_until"] == "2022-12-31"
+    # Values are exported as stored in the db.
+    assert rows[2] == {
+        "id": "00000000000000000000000000000002",
+        "description": "Guitar lessons",
+        "start": "2022-08-24 16:15:00",
+        "end": "2022-08-24 17:00:00",
+        "recurrence": None,
+        "recurrence_until": None,
+        "recurrence_count": None,
+        "priority": 0,
+        "latest_end": None,
+    }
+
+
+def test_export_events_ics(events, tmp_path):
+    path = tmp_path / "events.ics"
+
+    export_events(str(path), "ics")
+
+    content = path.read_bytes().decode()
+    lines = content.split("\r\n")
+    assert lines[:3] == ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Garendar//Garendar//EN"]
+    assert lines[-2:] == ["END:VCALENDAR", ""]
+    assert content.count("BEGIN:VEVENT") == 3
+    # The first occurrence of the standup is on Monday.
+    assert "DTSTART:20220822T100000\r\nDTEND:20220822T101500\r\n" in content
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR;UNTIL=20221231T235959\r\nEXDATE:20220823T100000\r\n" in content
+    assert "SUMMARY:Meet Jamie\\, for coffee\r\n" in content
+    # The timestamp is in UTC.
+    assert re.search(r"\r\nDTSTAMP:\d{8}T\d{6}Z\r\n", content)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "SUMMARY:" + "a" * 67,
+        "SUMMARY:" + "a" * 200,
+        # 2 and 4 octet characters, which can't be split across lines.
+        "SUMMARY:Réunion café " + "é" * 40 + "😀" * 20,
+    ],
+)
+def test_fold_ics_line(line):
+    folded = _fold_ics_line(line)
+
+    assert folded.endswith("\r\n")
+    lines = folded[:-2].split("\r\n")
+    assert all(len(folded_line.encode()) <= 75 for folded_line in lines)
+    assert all(folded_line.startswith(" ") for folded_line in lines[1:])
+    assert lines[0] + "".join(folded_line[1:] for folded_line in lines[1:]) == line
+
+
+@pytest.mark.parametrize(
+    "start, end, expected_descriptions",
+    [
+        ("2022/08/23 15:30", None, ["Standup", "Meet Jamie, for coffee", "Guitar lessons"]),
+        ("2022/08/23 16:00", None, ["Standup", "Guitar lessons"]),
+        (None, "2022/08/24 16:15", ["Standup", "Meet Jamie, for coffee"]),
+        ("2022/08/24 00:00", "2022/08/25 00:00", ["Standup", "Guitar lessons"]),
+        ("2023/01/01 00:00", None, []),
+    ],
+)
+def test_export_events_time_range(events, tmp_path, start, end, expected_descriptions):
+    path = tmp_path / "events.csv"
+
+    count = export_events(str(path), "csv", start=start and _get_dt(start), end=end and _get_dt(end))
+
+    with open(path, newline="") as file:
+        assert [row["description"] for row in csv.DictReader(file)] == expected_descriptions
+    assert count == len(expected_descriptions)
+
+
+@pytest.mark.parametrize(
+    "export_format, start, end, error_msg",
+    [
+        ("xml", None, None, "Unknown export format xml, use one of: ics, csv, jsonl"),
+        ("csv", "2022/08/24 00:00", "2022/08/24 00:00", "Export range start should be before its end"),
+    ],
+)
+def test_export_events_error_cases(db, tmp_path, export_format, start, end, error_msg):
+    with pytest.raises(ValidationError, match=error_msg):
+        export_events(
+            str(tmp_path / "events"), export_format, start=start and _get_dt(start), end=end and _get_dt(end)
+        )
+
+
+def _get_dt(datetime_str):
+    return datetime.strptime(datetime_str, "%Y/%m/%d %H:%M")
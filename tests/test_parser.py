@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 
@@ -62,6 +62,32 @@ def test_parse_event_details(event_string, expected_event_dict):
         ("2022/08/27 16:10 -> 2022/08/27 16:40 - ", "Invalid event string: "),
         ("2022/08/27 16:10 -> 2022/08/28 16:10 - 1 day", "Event can't be longer than 9 hours: "),
         ("2022/08/27 16:40 -> 2022/08/27 16:10 - 1 day", "Event Start can't be after event end: "),
+        ("2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | weekly", "Recurring events need an until date or a count: "),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | weekly until 22/12/31",
+            "Invalid recurrence, use `until YYYY/MM/DD` or `count N`: ",
+        ),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | weekly until 2022/08/21",
+            "Recurrence can't end before event start: ",
+        ),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | daily count 0",
+            "Recurrence count should be at least 1: ",
+        ),
+        ("2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | priority high", "Priority should be a whole number: "),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | by 2022/08/22",
+            "Latest end should be in the format YYYY/MM/DD HH:mm: ",
+        ),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | by 2022/08/22 10:10",
+            "Latest end can't be before event end: ",
+        ),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | daily count 2 | by 2022/08/23 10:15",
+            "Recurring events can't have a latest end: ",
+        ),
     ],
 )
 def test_parse_event_details_error_cases(event_string, error_msg):
@@ -70,6 +96,48 @@ def test_parse_event_details_error_cases(event_string, error_msg):
         parse_event_details(event_string)
 
 
+@pytest.mark.parametrize(
+    "event_string, expected_recurrence",
+    [
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | weekdays until 2022/12/31",
+            {"recurrence": "weekdays", "recurrence_until": date(2022, 12, 31), "recurrence_count": None},
+        ),
+        (
+            "2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | weekly count 10",
+            {"recurrence": "weekly", "recurrence_until": None, "recurrence_count": 10},
+        ),
+    ],
+)
+def test_parse_event_details_recurring(event_string, expected_recurrence):
+    event_dict = parse_event_details(event_string)
+    assert event_dict == {
+        "description": "Standup",
+        "duration": 15,
+        "start": datetime(2022, 8, 22, 10, 00),
+        "end": datetime(2022, 8, 22, 10, 15),
+        **expected_recurrence,
+    }
+
+
+def test_parse_event_details_priority_and_latest_end():
+    event_dict = parse_event_details("2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | priority 2 | by 2022/08/23 12:00")
+    assert event_dict == {
+        "description": "Sync",
+        "duration": 15,
+        "start": datetime(2022, 8, 22, 10, 00),
+        "end": datetime(2022, 8, 22, 10, 15),
+        "priority": 2,
+        "latest_end": datetime(2022, 8, 23, 12, 00),
+    }
+
+
+def test_parse_event_details_description_with_recurrence_delimiter():
+    event_dict = parse_event_details("2022/08/22 10:00 -> 2022/08/22 10:15 - Sync | Platform team")
+    assert event_dict["description"] == "Sync | Platform team"
+    assert "recurrence" not in event_dict
+
+
 def test_parse_input_events():
     input_string = (
         "2022/08/23 15:00 -> 2022/08/23 16:00 - Meet Jamie for coffee,"
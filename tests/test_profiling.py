@@ -0,0 +1,119 @@
+import json
+import pstats
+import random
+from datetime import datetime
+
+from benchmarks.bench_engines import FIRST_DAY
+from benchmarks.fuzz_engines import insert_events
+from benchmarks.replay_shape import generate_calendar, generate_new_events
+from models.event import Event
+from src.event_parser import parse_input_events
+from src.profiling import get_histogram, get_input_shape, profile_run
+from src.scheduler import Scheduler
+
+
+def test_get_histogram():
+    assert get_histogram([-5, 0, 4, 5, 30, 100], (0, 5, 15, 60)) == {"bins": [0, 5, 15, 60], "counts": [3, 1, 1, 1]}
+
+
+def test_get_input_shape(db):
+    insert_events(
+        [
+            {"start": _get_dt("2022/08/22 09:00"), "end": _get_dt("2022/08/22 10:00"), "description": "A"},
+            {"start": _get_dt("2022/08/22 10:10"), "end": _get_dt("2022/08/22 10:40"), "description": "B"},
+            {"start": _get_dt("2022/08/22 10:20"), "end": _get_dt("2022/08/22 10:30"), "description": "C"},
+            {"start": _get_dt("2022/08/23 12:00"), "end": _get_dt("2022/08/23 12:10"), "description": "D"},
+        ]
+    )
+    Event.create(
+        description="Standup",
+        start=_get_dt("2022/08/22 10:00"),
+        end=_get_dt("2022/08/22 10:15"),
+        recurrence="weekdays",
+        recurrence_count=10,
+    )
+    new_events = parse_input_events(
+        "2022/08/25 09:00 -> 2022/08/25 09:20 - Meet Jamie | priority 2,"
+        "2022/08/27 17:10 -> 2022/08/27 19:40 - Meet Jamie for 2 hr 30 mins | by 2022/08/30 12:00,"
+        "2022/08/26 10:00 -> 2022/08/26 10:15 - Review | weekly count 4"
+    )
+
+    shape = get_input_shape(new_events)
+
+    assert shape["existing_events"] == {
+        "count": 4,
+        "recurring": {"weekdays": 1},
+        "days": 2,
+        "durations": {"bins": [0, 15, 30, 60, 120, 240, 480], "counts": [2, 0, 1, 1, 0, 0, 0]},
+        # The gap after A, C overlaps B, and no gap over the night.
+        "gaps": {"bins": [0, 5, 15, 30, 60, 120, 240, 480], "counts": [0, 1, 0, 0, 0, 0, 0, 0]},
+        "overlaps": 1,
+    }
+    assert shape["new_events"] == {
+        "count": 3,
+        "recurring": {"weekly": 1},
+        "days": 3,
+        "offset_days": 3,
+        "durations": {"bins": [0, 15, 30, 60, 120, 240, 480], "counts": [0, 2, 0, 0, 1, 0, 0]},
+        "outside_workdays": 1,
+        "with_priority": 1,
+        "with_latest_end": 1,
+    }
+    # Nothing is kept which could identify the events.
+    assert "Jamie" not in json.dumps(shape)
+    assert "2022" not in json.dumps(shape)
+
+
+def test_profile_run(db, tmp_path):
+    input_events = "2022/08/27 17:10 -> 2022/08/27 19:40 - Meet Jamie for 2 hr 30 mins"
+
+    path = profile_run(
+        lambda: parse_input_events(input_events), Scheduler().schedule_events, str(tmp_path / "profiles")
+    )
+
+    assert Event.select().count() == 1
+    profiled_functions = {function for _, _, function in pstats.Stats(f"{path}.prof").stats}
+    assert "parse_input_events" in profiled_functions
+    # Taking the shape isn't profiled.
+    assert "get_input_shape" not in profiled_functions
+    with open(f"{path}.txt") as file:
+        hotspots = file.read()
+    assert "Top 20 functions by cumulative time" in hotspots
+    assert "src/scheduler.py" in hotspots
+    with open(f"{path}.json") as file:
+        assert json.load(file)["new_events"]["count"] == 1
+
+
+def test_replay_shape(db):
+    calendar_shape = {
+        "count": 200,
+        "durations": get_histogram([30, 60, 60, 90], (0, 15, 30, 60, 120, 240, 480)),
+        "gaps": get_histogram([0, 0, 10], (0, 5, 15, 30, 60, 120, 240, 480)),
+    }
+    new_events_shape = {
+        "count": 100,
+        "days": 10,
+        "durations": get_histogram([15], (0, 15, 30, 60, 120, 240, 480)),
+        "outside_workdays": 30,
+        "with_priority": 10,
+    }
+    rng = random.Random(0)
+    insert_events(generate_calendar(rng, calendar_shape, FIRST_DAY))
+    new_events = generate_new_events(rng, new_events_shape, datetime(2022, 9, 12))
+
+    shape = get_input_shape(new_events)
+
+    assert shape["existing_events"]["count"] == 200
+    # The sampled durations are in the bins of the shape.
+    assert [bool(count) for count in shape["existing_events"]["durations"]["counts"]] == [
+        bool(count) for count in calendar_shape["durations"]["counts"]
+    ]
+    assert shape["existing_events"]["overlaps"] == 0
+    assert shape["new_events"]["count"] == 100
+    assert shape["new_events"]["durations"]["counts"] == [0, 100, 0, 0, 0, 0, 0]
+    assert shape["new_events"]["outside_workdays"] == 30
+    assert shape["new_events"]["with_priority"] == 10
+
+
+def _get_dt(datetime_str):
+    return datetime.strptime(datetime_str, "%Y/%m/%d %H:%M")
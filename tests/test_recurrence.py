@@ -0,0 +1,91 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.recurrence import get_occurrence_start, iter_occurrences
+
+
+@pytest.mark.parametrize(
+    "recurrence, index, expected_start",
+    [
+        ("daily", 0, "2022-08-25 10:00"),
+        ("daily", 3, "2022-08-28 10:00"),
+        ("weekly", 2, "2022-09-08 10:00"),
+        ("weekdays", 0, "2022-08-25 10:00"),  # Thursday
+        ("weekdays", 1, "2022-08-26 10:00"),  # Friday
+        ("weekdays", 2, "2022-08-29 10:00"),  # Monday
+        ("weekdays", 5, "2022-09-01 10:00"),  # Thursday
+        ("weekdays", 7, "2022-09-05 10:00"),  # Monday
+    ],
+)
+def test_get_occurrence_start(recurrence, index, expected_start):
+    event = {"start": _get_dt("2022-08-25 10:00"), "end": _get_dt("2022-08-25 10:30"), "recurrence": recurrence}
+
+    assert get_occurrence_start(event, index) == _get_dt(expected_start)
+
+
+def test_get_occurrence_start_weekdays_from_weekend():
+    event = {"start": _get_dt("2022-08-27 10:00"), "end": _get_dt("2022-08-27 10:30"), "recurrence": "weekdays"}
+
+    assert get_occurrence_start(event, 0) == _get_dt("2022-08-29 10:00")
+    assert get_occurrence_start(event, 4) == _get_dt("2022-09-02 10:00")
+
+
+@pytest.mark.parametrize(
+    "window_start, window_end, expected_starts",
+    [
+        ("2022-08-22 00:00", "2022-08-24 00:00", ["2022-08-22 10:00", "2022-08-23 10:00"]),
+        ("2022-08-22 10:15", "2022-08-22 12:00", ["2022-08-22 10:00"]),
+        ("2022-08-22 10:30", "2022-08-23 10:00", []),
+        ("2022-09-01 00:00", "2022-09-10 00:00", ["2022-09-01 10:00", "2022-09-02 10:00", "2022-09-05 10:00"]),
+        ("2022-09-06 00:00", "2022-09-10 00:00", []),
+    ],
+)
+def test_iter_occurrences_in_window(window_start, window_end, expected_starts):
+    event = {
+        "start": _get_dt("2022-08-22 10:00"),
+        "end": _get_dt("2022-08-22 10:30"),
+        "description": "Standup",
+        "recurrence": "weekdays",
+        "recurrence_until": date(2022, 9, 5),
+    }
+
+    occurrences = iter_occurrences(event, _get_dt(window_start), _get_dt(window_end))
+
+    assert [occurrence["start"] for occurrence in occurrences] == [_get_dt(start) for start in expected_starts]
+
+
+def test_iter_occurrences_count_and_exdates():
+    event = {
+        "start": _get_dt("2022-08-22 10:00"),
+        "end": _get_dt("2022-08-22 10:30"),
+        "description": "Standup",
+        "recurrence": "weekly",
+        "recurrence_count": 3,
+    }
+
+    occurrences = list(iter_occurrences(event, event["start"], exdates={_get_dt("2022-08-29 10:00")}))
+
+    assert occurrences == [
+        {"start": _get_dt("2022-08-22 10:00"), "end": _get_dt("2022-08-22 10:30"), "description": "Standup"},
+        {"start": _get_dt("2022-09-05 10:00"), "end": _get_dt("2022-09-05 10:30"), "description": "Standup"},
+    ]
+
+
+def test_iter_occurrences_is_lazy():
+    event = {
+        "start": _get_dt("2022-08-22 10:00"),
+        "end": _get_dt("2022-08-22 10:30"),
+        "description": "Standup",
+        "recurrence": "daily",
+        "recurrence_count": 10**12,
+    }
+
+    occurrences = iter_occurrences(event, _get_dt("3000-01-01 00:00"))
+
+    assert next(occurrences)["start"] == _get_dt("3000-01-01 10:00")
+
+
+def _get_dt(datetime_str):
+    """Return datetime in less characters."""
+    return datetime.fromisoformat(datetime_str)
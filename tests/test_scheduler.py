@@ -1,9 +1,13 @@
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 
+import events
+from models.event import Event, RecurrenceException
+from src.event_parser import parse_input_events
+from src.exceptions import ValidationError
 from src.scheduler import Scheduler
-from src.utils import get_all_events
+from src.utils import get_all_events, get_recurring_events
 
 
 def test_schedule_events(db):
@@ -39,6 +43,406 @@ def test_schedule_events(db):
         assert event.description == expected_event[2]
 
 
+def test_schedule_recurring_events(db):
+    recurring_event = {
+        "start": _get_dt("2022-08-26 10:00"),
+        "end": _get_dt("2022-08-26 11:00"),
+        "duration": 60,
+        "description": "Standup",
+        "recurrence": "daily",
+        "recurrence_until": date(2022, 8, 31),
+        "recurrence_count": None,
+    }
+    new_events = [
+        recurring_event,
+        {"start": _get_dt("2022-08-29 10:30"), "end": _get_dt("2022-08-29 11:00"), "duration": 30, "description": "A"},
+        {"start": _get_dt("2022-08-30 09:00"), "end": _get_dt("2022-08-30 10:30"), "duration": 90, "description": "B"},
+    ]
+
+    scheduler = Scheduler()
+    scheduler.schedule_events(new_events)
+
+    # Only the rule row is stored for the occurrences, the weekend occurrences of a daily rule stay on the rule.
+    # Rescheduled events skip past the occurrences of the rule.
+    assert [(event.start, event.end, event.description) for event in get_all_events()] == [
+        (_get_dt("2022-08-26 10:00"), _get_dt("2022-08-26 11:00"), "Standup"),
+        (_get_dt("2022-08-26 11:00"), _get_dt("2022-08-26 12:30"), "B"),
+        (_get_dt("2022-08-29 11:00"), _get_dt("2022-08-29 11:30"), "A"),
+    ]
+    assert RecurrenceException.select().count() == 0
+    # The occurrences blocked time only while finding the slots.
+    assert [event["description"] for event in scheduler.existing_events] == ["B", "A"]
+
+
+def test_schedule_recurring_event_with_clashing_occurrence(db):
+    Scheduler().schedule_events(
+        [
+            {"start": _get_dt(start), "end": _get_dt(end), "duration": duration, "description": desc}
+            for start, end, duration, desc in [
+                ("2022-08-29 10:00", "2022-08-29 11:30", 90, "Review"),
+                ("2022-08-29 11:30", "2022-08-29 12:00", 30, "Lunch"),
+            ]
+        ]
+    )
+    recurring_event = {
+        "start": _get_dt("2022-08-29 10:00"),
+        "end": _get_dt("2022-08-29 10:30"),
+        "duration": 30,
+        "description": "Sync",
+        "recurrence": "weekly",
+        "recurrence_until": None,
+        "recurrence_count": 3,
+    }
+
+    Scheduler().schedule_events([recurring_event])
+
+    # The clashing occurrence is moved to the first free time after its start, not into an earlier gap.
+    events = sorted((event.start, event.end, event.description, event.requested_start) for event in get_all_events())
+    assert events == [
+        (_get_dt("2022-08-29 10:00"), _get_dt("2022-08-29 10:30"), "Sync", None),
+        (_get_dt("2022-08-29 10:00"), _get_dt("2022-08-29 11:30"), "Review", None),
+        (_get_dt("2022-08-29 11:30"), _get_dt("2022-08-29 12:00"), "Lunch", None),
+        (_get_dt("2022-08-29 12:00"), _get_dt("2022-08-29 12:30"), "Sync", _get_dt("2022-08-29 10:00")),
+    ]
+    # The later occurrences don't clash, and are left on the rule.
+    assert get_recurring_events()[0]["exdates"] == {_get_dt("2022-08-29 10:00")}
+
+
+def test_schedule_recurring_event_with_clashing_occurrence_after_the_batch(db):
+    Scheduler().schedule_events(parse_input_events("2022/09/05 10:00 -> 2022/09/05 11:00 - Existing"))
+
+    Scheduler().schedule_events(parse_input_events("2022/08/29 10:00 -> 2022/08/29 10:30 - Standup | weekly count 4"))
+
+    # Every occurrence of the rule is checked, not only the ones on the days of the batch.
+    assert get_recurring_events()[0]["exdates"] == {_get_dt("2022-09-05 10:00")}
+    events = sorted((event.start, event.end, event.description) for event in get_all_events() if not event.recurrence)
+    assert events == [
+        (_get_dt("2022-09-05 10:00"), _get_dt("2022-09-05 11:00"), "Existing"),
+        (_get_dt("2022-09-05 11:00"), _get_dt("2022-09-05 11:30"), "Standup"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "input_event",
+    [
+        "2022/08/29 19:00 -> 2022/08/29 19:30 - Late | weekly count 4",
+        "2022/08/29 08:00 -> 2022/08/29 09:30 - Early | daily count 4",
+        "2022/08/27 10:00 -> 2022/08/27 10:30 - Saturday | weekly count 4",
+    ],
+)
+def test_schedule_recurring_event_outside_workdays(db, input_event):
+    with pytest.raises(ValidationError):
+        Scheduler().schedule_events(parse_input_events(input_event))
+
+    assert Event.select().count() == 0
+
+
+def test_schedule_events_with_stored_recurring_event_outside_workday(db):
+    Event.create(
+        start=_get_dt("2022-08-22 19:00"),
+        end=_get_dt("2022-08-22 20:00"),
+        description="Late",
+        recurrence="weekdays",
+        recurrence_count=10,
+    )
+    Scheduler().schedule_events(parse_input_events("2022/08/23 10:00 -> 2022/08/23 16:00 - A"))
+
+    Scheduler().schedule_events(parse_input_events("2022/08/23 09:00 -> 2022/08/23 12:00 - D"))
+
+    # Occurrences outside the workday don't block any time, and no slot runs past the workday end.
+    events = sorted((event.start, event.end, event.description) for event in get_all_events() if not event.recurrence)
+    assert events == [
+        (_get_dt("2022-08-23 10:00"), _get_dt("2022-08-23 16:00"), "A"),
+        (_get_dt("2022-08-24 09:00"), _get_dt("2022-08-24 12:00"), "D"),
+    ]
+
+
+def test_schedule_daily_recurring_event_until_far_future(db):
+    Scheduler().schedule_events(
+        parse_input_events("2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | daily until 2099/12/31")
+    )
+
+    assert Event.select().count() == 1
+    assert RecurrenceException.select().count() == 0
+
+
+def test_schedule_events_by_priority(db):
+    existing_event_details = [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), 180, "Busy"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), 60, "Review"),
+    ]
+    Scheduler().schedule_events(
+        [
+            {"start": start, "end": end, "duration": duration, "description": desc}
+            for start, end, duration, desc in existing_event_details
+        ]
+    )
+    # Events on a Saturday, which need rescheduling.
+    new_events = [
+        {"start": _get_dt("2022-08-27 10:00"), "end": _get_dt("2022-08-27 11:00"), "duration": 60, "description": desc}
+        for desc in ("Sync 0", "Sync 1", "Sync 2", "Sync 3")
+    ]
+    new_events += [
+        {
+            "start": _get_dt("2022-08-22 11:00"),
+            "end": _get_dt("2022-08-22 12:00"),
+            "duration": 60,
+            "description": "Report",
+            "latest_end": _get_dt("2022-08-22 12:00"),
+        },
+        {
+            "start": _get_dt("2022-08-22 11:00"),
+            "end": _get_dt("2022-08-22 11:30"),
+            "duration": 30,
+            "description": "Urgent",
+            "priority": 1,
+            "latest_end": _get_dt("2022-08-22 13:00"),
+        },
+    ]
+
+    scheduler = Scheduler()
+    scheduler.schedule_events(new_events)
+
+    # Higher priority first, then earlier latest end, get the earliest slots.
+    assert [(event.start, event.end, event.description) for event in get_all_events()] == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "Busy"),
+        (_get_dt("2022-08-22 12:00"), _get_dt("2022-08-22 12:30"), "Urgent"),
+        (_get_dt("2022-08-22 12:30"), _get_dt("2022-08-22 13:30"), "Report"),
+        (_get_dt("2022-08-22 13:30"), _get_dt("2022-08-22 14:30"), "Sync 0"),
+        (_get_dt("2022-08-22 14:30"), _get_dt("2022-08-22 15:30"), "Sync 1"),
+        (_get_dt("2022-08-22 15:30"), _get_dt("2022-08-22 16:30"), "Sync 2"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "Review"),
+        (_get_dt("2022-08-23 09:00"), _get_dt("2022-08-23 10:00"), "Sync 3"),
+    ]
+    assert [event["description"] for event in scheduler.missed_deadline_events] == ["Report"]
+    assert Event.get(Event.description == "Urgent").priority == 1
+    assert Event.get(Event.description == "Report").latest_end == _get_dt("2022-08-22 12:00")
+
+
+@pytest.mark.parametrize(
+    "options, expected_clash",
+    [
+        ("", ("2022-08-22 10:15", "2022-08-22 10:45", "Clash")),
+        # Prioritised events get the earliest slot of the day.
+        (" | priority 3 | by 2022/08/22 11:00", ("2022-08-22 09:00", "2022-08-22 09:30", "Clash")),
+    ],
+)
+def test_schedule_events_without_single_events_on_the_same_day(db, options, expected_clash):
+    Scheduler().schedule_events(
+        parse_input_events("2022/08/22 10:00 -> 2022/08/22 10:15 - Standup | weekdays until 2022/12/31")
+    )
+    scheduler = Scheduler()
+
+    scheduler.schedule_events(parse_input_events(f"2022/08/22 10:00 -> 2022/08/22 10:30 - Clash{options}"))
+
+    # The clashing event gets free time on the same day, not the next workday.
+    start, end, description = expected_clash
+    assert sorted(_get_event_times()) == sorted(
+        [
+            (_get_dt("2022-08-22 10:00"), _get_dt("2022-08-22 10:15"), "Standup"),
+            (_get_dt(start), _get_dt(end), description),
+        ]
+    )
+    assert scheduler.missed_deadline_events == []
+
+
+def test_reschedule_by_priority_without_earlier_events(db):
+    Scheduler().schedule_events(parse_input_events("2022/08/23 15:00 -> 2022/08/23 16:00 - A"))
+    scheduler = Scheduler()
+
+    scheduler.schedule_events(
+        parse_input_events("2022/08/23 15:00 -> 2022/08/23 16:00 - B | priority 2 | by 2022/08/23 16:30")
+    )
+
+    # The gap from the workday start to the first event is found, even with no event on an earlier day.
+    assert _get_event_times() == [
+        (_get_dt("2022-08-23 09:00"), _get_dt("2022-08-23 10:00"), "B"),
+        (_get_dt("2022-08-23 15:00"), _get_dt("2022-08-23 16:00"), "A"),
+    ]
+    assert scheduler.missed_deadline_events == []
+
+
+def test_reschedule_by_priority_after_a_slot_past_the_last_event(db):
+    Event.create(
+        start=_get_dt("2022-08-22 17:30"),
+        end=_get_dt("2022-08-22 18:00"),
+        description="Wrap up",
+        recurrence="daily",
+        recurrence_count=1,
+    )
+    Scheduler().schedule_events(parse_input_events("2022/08/22 09:00 -> 2022/08/22 12:00 - A"))
+    Scheduler().schedule_events(
+        parse_input_events(
+            "2022/08/22 09:00 -> 2022/08/22 14:00 - X | priority 2,"
+            "2022/08/22 09:00 -> 2022/08/22 10:00 - Y | priority 1"
+        )
+    )
+
+    # X takes the slot between A and the occurrence, Y doesn't fit in any slot and goes after X, not after A.
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 12:00"), _get_dt("2022-08-22 17:00"), "X"),
+        (_get_dt("2022-08-22 17:30"), _get_dt("2022-08-22 18:00"), "Wrap up"),
+        (_get_dt("2022-08-23 09:00"), _get_dt("2022-08-23 10:00"), "Y"),
+    ]
+
+
+def _schedule_monday_events() -> Scheduler:
+    """Schedule events on Monday, 2022-08-22, with `Pushed` rescheduled from 12:30 to 13:00."""
+    existing_event_details = [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), 180, "A"),
+        (_get_dt("2022-08-22 12:00"), _get_dt("2022-08-22 13:00"), 60, "B"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), 60, "C"),
+    ]
+    Scheduler().schedule_events(
+        [
+            {"start": start, "end": end, "duration": duration, "description": desc}
+            for start, end, duration, desc in existing_event_details
+        ]
+    )
+    scheduler = Scheduler()
+    pushed_event = {"start": _get_dt("2022-08-22 12:30"), "end": _get_dt("2022-08-22 13:30"), "description": "Pushed"}
+    scheduler.schedule_events([{**pushed_event, "duration": 60}])
+    return scheduler
+
+
+def _get_event_times() -> list[tuple]:
+    return [(event.start, event.end, event.description) for event in get_all_events()]
+
+
+def test_delete_event(db):
+    scheduler = _schedule_monday_events()
+    pushed_event = Event.get(Event.description == "Pushed")
+    assert pushed_event.start == _get_dt("2022-08-22 13:00")
+    assert pushed_event.requested_start == _get_dt("2022-08-22 12:30")
+    assert scheduler.unscheduled_slots == {
+        180: [{"start": _get_dt("2022-08-22 14:00"), "end": _get_dt("2022-08-22 17:00")}]
+    }
+
+    pulled_events = scheduler.delete_event(Event.get(Event.description == "B").id, pull_earlier=True)
+
+    assert [event["description"] for event in pulled_events] == ["Pushed"]
+    # Pushed is moved to the start it asked for, not to the start of the freed time.
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 12:30"), _get_dt("2022-08-22 13:30"), "Pushed"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "C"),
+    ]
+    assert Event.get(Event.description == "Pushed").requested_start is None
+    # The time freed by Pushed is merged with the gap after it.
+    assert scheduler.unscheduled_slots == {
+        30: [{"start": _get_dt("2022-08-22 12:00"), "end": _get_dt("2022-08-22 12:30")}],
+        210: [{"start": _get_dt("2022-08-22 13:30"), "end": _get_dt("2022-08-22 17:00")}],
+    }
+    assert [event["description"] for event in scheduler.existing_events] == ["A", "Pushed", "C"]
+
+
+def test_delete_event_with_a_new_scheduler(db):
+    _schedule_monday_events()
+    scheduler = Scheduler()
+
+    pulled_events = scheduler.delete_event(Event.get(Event.description == "B").id, pull_earlier=True)
+
+    assert [event["description"] for event in pulled_events] == ["Pushed"]
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 12:30"), _get_dt("2022-08-22 13:30"), "Pushed"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "C"),
+    ]
+    # Only the day of the event is read, the other events aren't loaded.
+    assert scheduler.existing_events == []
+    assert scheduler.unscheduled_slots == {}
+
+
+def test_delete_event_without_pulling_events_earlier(db):
+    scheduler = _schedule_monday_events()
+
+    assert scheduler.delete_event(Event.get(Event.description == "B").id) == []
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 13:00"), _get_dt("2022-08-22 14:00"), "Pushed"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "C"),
+    ]
+    assert scheduler.unscheduled_slots == {
+        60: [{"start": _get_dt("2022-08-22 12:00"), "end": _get_dt("2022-08-22 13:00")}],
+        180: [{"start": _get_dt("2022-08-22 14:00"), "end": _get_dt("2022-08-22 17:00")}],
+    }
+
+
+def test_move_event(db):
+    scheduler = _schedule_monday_events()
+
+    pulled_events = scheduler.move_event(
+        Event.get(Event.description == "B").id, _get_dt("2022-08-23 10:00"), pull_earlier=True
+    )
+
+    assert [event["description"] for event in pulled_events] == ["Pushed"]
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 12:30"), _get_dt("2022-08-22 13:30"), "Pushed"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "C"),
+        (_get_dt("2022-08-23 10:00"), _get_dt("2022-08-23 11:00"), "B"),
+    ]
+    # B is moved out of the day which was scheduled.
+    assert [event["description"] for event in scheduler.existing_events] == ["A", "Pushed", "C"]
+
+
+@pytest.mark.parametrize(
+    "start, error_msg",
+    [
+        ("2022-08-27 10:00", "Events can only be moved within the workday on weekdays: B"),
+        ("2022-08-22 17:30", "Events can only be moved within the workday on weekdays: B"),
+        ("2022-08-22 11:30", "Event would overlap A: B"),
+    ],
+)
+def test_move_event_error_cases(db, start, error_msg):
+    scheduler = _schedule_monday_events()
+
+    with pytest.raises(ValidationError, match=error_msg):
+        scheduler.move_event(Event.get(Event.description == "B").id, _get_dt(start))
+
+
+def test_schedule_events_after_deleting_an_event(db):
+    scheduler = _schedule_monday_events()
+    scheduler.delete_event(Event.get(Event.description == "B").id)
+
+    scheduler.schedule_events(parse_input_events("2022/08/22 10:00 -> 2022/08/22 11:00 - D"))
+
+    # The scheduler starts the batch afresh, the events of the last batch aren't saved again.
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 13:00"), _get_dt("2022-08-22 14:00"), "Pushed"),
+        (_get_dt("2022-08-22 14:00"), _get_dt("2022-08-22 15:00"), "D"),
+        (_get_dt("2022-08-22 17:00"), _get_dt("2022-08-22 18:00"), "C"),
+    ]
+    # The slots are found again for the batch, including the time freed by B, without the slots of the last batch.
+    assert scheduler.unscheduled_slots == {
+        60: [{"start": _get_dt("2022-08-22 12:00"), "end": _get_dt("2022-08-22 13:00")}],
+        120: [{"start": _get_dt("2022-08-22 15:00"), "end": _get_dt("2022-08-22 17:00")}],
+    }
+
+
+def test_events_cli(db, capsys):
+    _schedule_monday_events()
+    b_id = Event.get(Event.description == "B").id
+
+    events.main(["list", "--from", "2022/08/22 12:00"])
+    events.main(["delete", str(b_id), "--pull-earlier"])
+    events.main(["move", str(Event.get(Event.description == "C").id), "2022/08/22 15:00"])
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"{b_id}  2022/08/22 12:00 -> 2022/08/22 13:00 - B",
+        f"{Event.get(Event.description == 'Pushed').id}  2022/08/22 13:00 -> 2022/08/22 14:00 - Pushed",
+        f"{Event.get(Event.description == 'C').id}  2022/08/22 17:00 -> 2022/08/22 18:00 - C",
+        "Pulled earlier: 2022/08/22 12:30 -> 2022/08/22 13:30 - Pushed",
+    ]
+    assert _get_event_times() == [
+        (_get_dt("2022-08-22 09:00"), _get_dt("2022-08-22 12:00"), "A"),
+        (_get_dt("2022-08-22 12:30"), _get_dt("2022-08-22 13:30"), "Pushed"),
+        (_get_dt("2022-08-22 15:00"), _get_dt("2022-08-22 16:00"), "C"),
+    ]
+
+
 @pytest.mark.parametrize(
     "event1, event2, expected_result",
     [
@@ -144,6 +548,116 @@ def test_schedule_next(last_event, event, expected_final_event):
     assert final_event == expected_final_event == scheduler.scheduled_events[0]
 
 
+
+def test_reschedule_events_with_more_slots_than_events():
+    scheduler = Scheduler()
+    scheduler.unscheduled_slots[60] = [
+        {"start": _get_dt("2022-08-22 10:00"), "end": _get_dt("2022-08-22 11:00")},
+        {"start": _get_dt("2022-08-22 12:00"), "end": _get_dt("2022-08-22 13:00")},
+    ]
+    scheduler.update_unscheduled_events(
+        {"start": _get_dt("2022-08-22 09:30"), "end": _get_dt("2022-08-22 10:30"), "duration": 60, "description": "A"}
+    )
+
+    # Once the only event of the duration is scheduled, the slot left over is skipped.
+    scheduler.reschedule_events()
+
+    assert [(event["start"], event["description"]) for event in scheduler.scheduled_events] == [
+        (_get_dt("2022-08-22 10:00"), "A")
+    ]
+    assert scheduler.unscheduled_events == {}
+
+
+@pytest.mark.parametrize(
+    "event1, event2, expected_slots",
+    [
+        # Events on different days, no slot over the night.
+        (
+            ("2022-08-22 16:00", "2022-08-22 17:00"),
+            ("2022-08-23 10:00", "2022-08-23 11:00"),
+            {60: [("2022-08-22 17:00", "2022-08-22 18:00"), ("2022-08-23 09:00", "2022-08-23 10:00")]},
+        ),
+        # Events outside the workday on different days, no negative slots.
+        (("2022-08-22 17:00", "2022-08-22 19:30"), ("2022-08-23 08:00", "2022-08-23 08:30"), {}),
+        # The second event starts before the first one ends.
+        (("2022-08-22 10:00", "2022-08-22 12:00"), ("2022-08-22 11:00", "2022-08-22 11:30"), {}),
+        (
+            ("2022-08-22 10:00", "2022-08-22 11:00"),
+            ("2022-08-22 11:30", "2022-08-22 12:00"),
+            {30: [("2022-08-22 11:00", "2022-08-22 11:30")]},
+        ),
+    ],
+)
+def test_update_unscheduled_slots(event1, event2, expected_slots):
+    scheduler = Scheduler()
+
+    scheduler.update_unscheduled_slots(
+        {"start": _get_dt(event1[0]), "end": _get_dt(event1[1])},
+        {"start": _get_dt(event2[0]), "end": _get_dt(event2[1])},
+    )
+
+    assert scheduler.unscheduled_slots == {
+        duration: [{"start": _get_dt(start), "end": _get_dt(end)} for start, end in slots]
+        for duration, slots in expected_slots.items()
+    }
+
+
+@pytest.mark.parametrize(
+    "existing_event_details, expected_start",
+    [
+        # Short doesn't free any time within Long, the gap after Short is inside Long.
+        (
+            [
+                ("2022-08-22 09:00", "2022-08-22 13:00", 240, "Long"),
+                ("2022-08-22 10:00", "2022-08-22 10:30", 30, "Short"),
+                ("2022-08-22 13:00", "2022-08-22 18:00", 300, "Afternoon"),
+            ],
+            "2022-08-23 09:00",
+        ),
+        # Left over events are scheduled after Long which ends last, although Short starts last.
+        (
+            [
+                ("2022-08-22 09:00", "2022-08-22 17:00", 480, "Long"),
+                ("2022-08-22 10:00", "2022-08-22 10:30", 30, "Short"),
+            ],
+            "2022-08-22 17:00",
+        ),
+    ],
+)
+def test_schedule_events_within_a_longer_event(db, existing_event_details, expected_start):
+    Scheduler().schedule_events(
+        [
+            {"start": _get_dt(start), "end": _get_dt(end), "duration": duration, "description": desc}
+            for start, end, duration, desc in existing_event_details
+        ]
+    )
+
+    new_event = {"start": _get_dt("2022-08-22 10:00"), "end": _get_dt("2022-08-22 11:00"), "description": "New"}
+    Scheduler().schedule_events([{**new_event, "duration": 60}])
+
+    assert Event.get(Event.description == "New").start == _get_dt(expected_start)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_split_new_events_past_midnight(engine):
+    scheduler = Scheduler(engine)
+    event = {"start": _get_dt("2022-08-22 17:00"), "end": _get_dt("2022-08-23 02:00"), "duration": 540}
+
+    scheduler.split_new_events([event])
+
+    # The event ends before the workday end of the next day, but after the workday end of the day it starts.
+    assert scheduler.unscheduled_events == {540: [event]}
+
+
+def test_get_free_slot_past_midnight():
+    scheduler = Scheduler()
+
+    assert scheduler._get_free_slot(_get_dt("2022-08-22 17:30"), 540) == (
+        _get_dt("2022-08-23 09:00"),
+        _get_dt("2022-08-23 18:00"),
+    )
+
+
 def _get_dt(datetime_str):
     """Return datetime in less characters."""
     return datetime.fromisoformat(datetime_str)
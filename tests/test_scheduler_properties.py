@@ -0,0 +1,85 @@
+import random
+from datetime import timedelta
+
+import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+
+from benchmarks.bench_engines import FIRST_DAY
+from benchmarks.fuzz_engines import (
+    generate_calendar,
+    generate_recurring_events,
+    get_violations,
+    insert_events,
+    schedule,
+)
+from models.event import Event, RecurrenceException
+from src.exceptions import ValidationError
+from src.utils import is_outside_workdays
+
+# Events start in the first two weeks at any time of the day, so that a lot of them need rescheduling.
+MINUTES_IN_TWO_WEEKS = 14 * 24 * 60
+
+
+@st.composite
+def new_events(draw, max_size: int = 60) -> list[dict]:
+    events = []
+    for i in range(draw(st.integers(1, max_size))):
+        start = FIRST_DAY + timedelta(minutes=5 * draw(st.integers(0, MINUTES_IN_TWO_WEEKS // 5 - 1)))
+        duration = 5 * draw(st.integers(1, 9 * 12))
+        end = start + timedelta(minutes=duration)
+        event = {"start": start, "end": end, "duration": duration, "description": str(i)}
+        priority = draw(st.sampled_from([0, 0, 0, 1, 2]))
+        if priority:
+            event["priority"] = priority
+        if draw(st.integers(0, 4)) == 0:
+            event["latest_end"] = end + timedelta(minutes=5 * draw(st.integers(0, 2 * 24 * 12)))
+        events.append(event)
+    # Mostly rules within the workday, sometimes one outside of it, which is rejected.
+    rng = random.Random(draw(st.integers(0, 2**32)))
+    within_workday = draw(st.sampled_from([True, True, True, False]))
+    events.extend(generate_recurring_events(rng, draw(st.integers(0, 3)), FIRST_DAY, within_workday))
+    return sorted(events, key=lambda event: event["start"])
+
+
+def _reset_db(calendar_seed: int, calendar_size: int):
+    RecurrenceException.delete().execute()
+    Event.delete().execute()
+    insert_events(generate_calendar(random.Random(calendar_seed), calendar_size, FIRST_DAY))
+
+
+@settings(max_examples=50, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(events=new_events(), calendar_seed=st.integers(0, 2**32), calendar_size=st.integers(0, 200))
+def test_schedule_events_invariants(db, events, calendar_seed, calendar_size):
+    _reset_db(calendar_seed, calendar_size)
+    event_count = Event.select().count()
+
+    try:
+        _, scheduled_events = schedule("python", events)
+    except ValidationError:
+        # Only rules outside the workday are rejected, and nothing is saved.
+        assert any(is_outside_workdays(event) for event in events if event.get("recurrence"))
+        assert Event.select().count() == event_count
+        return
+
+    assert get_violations(events, scheduled_events) == []
+
+
+@settings(max_examples=25, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(events=new_events(), calendar_seed=st.integers(0, 2**32), calendar_size=st.integers(0, 200))
+def test_numpy_engine_schedules_like_python_engine(db, events, calendar_seed, calendar_size):
+    _reset_db(calendar_seed, calendar_size)
+    try:
+        _, python_scheduled_events = schedule("python", events)
+    except ValidationError:
+        with pytest.raises(ValidationError):
+            schedule("numpy", events)
+        return
+
+    _reset_db(calendar_seed, calendar_size)
+    _, numpy_scheduled_events = schedule("numpy", events)
+
+    assert get_violations(events, numpy_scheduled_events) == []
+    assert [(event["start"], event["end"], event["description"]) for event in numpy_scheduled_events] == [
+        (event["start"], event["end"], event["description"]) for event in python_scheduled_events
+    ]
@@ -0,0 +1,199 @@
+import logging
+from datetime import date, datetime
+
+import pytest
+from peewee import CharField
+from playhouse.migrate import SchemaMigrator, migrate
+
+from models.event import Event
+from src import storage
+from src.exceptions import ValidationError
+from src.scheduler import Scheduler
+from src.storage import get_event_models, get_shard_model, get_shard_months, migrate_shards, shard_events
+from src.utils import get_all_events, get_single_events
+
+
+@pytest.fixture()
+def sharded(db, monkeypatch):
+    monkeypatch.setattr(storage, "SHARD_EVENTS_BY_MONTH", True)
+    yield
+    for month in get_shard_months():
+        get_shard_model(month).drop_table()
+
+
+def _schedule_events(event_details: list[tuple]) -> Scheduler:
+    scheduler = Scheduler()
+    scheduler.schedule_events(
+        [
+            {"start": _get_dt(start), "end": _get_dt(end), "duration": duration, "description": desc}
+            for start, end, duration, desc in event_details
+        ]
+    )
+    return scheduler
+
+
+def _get_table_descriptions(month: str) -> list[str]:
+    model = get_shard_model(_get_dt(month))
+    return [event.description for event in model.select().order_by(model.start)]
+
+
+def test_schedule_events_sharded(sharded):
+    _schedule_events(
+        [
+            ("2022-08-31 17:00", "2022-08-31 18:00", 60, "A"),
+            ("2022-08-31 18:30", "2022-08-31 19:00", 30, "Rescheduled"),
+            ("2022-09-01 09:00", "2022-09-01 10:00", 60, "B"),
+        ]
+    )
+    Scheduler().schedule_events(
+        [
+            {
+                "start": _get_dt("2022-09-05 12:00"),
+                "end": _get_dt("2022-09-05 12:30"),
+                "duration": 30,
+                "description": "Lunch",
+                "recurrence": "weekdays",
+                "recurrence_until": date(2022, 9, 30),
+                "recurrence_count": None,
+            }
+        ]
+    )
+
+    assert get_shard_months() == [_get_dt("2022-08-01 00:00"), _get_dt("2022-09-01 00:00")]
+    assert _get_table_descriptions("2022-08-01 00:00") == ["A"]
+    assert _get_table_descriptions("2022-09-01 00:00") == ["B", "Rescheduled"]
+    # Recurring events stay in the event table.
+    assert [event.description for event in Event.select()] == ["Lunch"]
+    assert [event.description for event in get_all_events()] == ["A", "B", "Rescheduled", "Lunch"]
+
+
+def test_schedule_events_sharded_reads_only_the_window(sharded, caplog):
+    _schedule_events(
+        [
+            ("2022-07-29 09:00", "2022-07-29 10:00", 60, "July"),
+            ("2022-08-31 09:00", "2022-08-31 10:00", 60, "August"),
+            ("2022-09-01 09:00", "2022-09-01 10:00", 60, "Before"),
+            ("2022-09-05 09:00", "2022-09-05 10:00", 60, "Existing"),
+        ]
+    )
+    scheduler = Scheduler()
+
+    with caplog.at_level(logging.DEBUG, logger="peewee"):
+        scheduler.schedule_events(
+            [
+                {
+                    "start": _get_dt("2022-09-05 09:00"),
+                    "end": _get_dt("2022-09-05 09:30"),
+                    "duration": 30,
+                    "description": "New",
+                }
+            ]
+        )
+
+    queries = " ".join(record.getMessage() for record in caplog.records)
+    assert "event_2022_09" in queries
+    assert "event_2022_07" not in queries
+    assert "event_2022_08" not in queries
+    assert [event["description"] for event in scheduler.existing_events] == ["Existing"]
+    assert [(event.start, event.description) for event in get_all_events(_get_dt("2022-09-05 00:00"))] == [
+        (_get_dt("2022-09-05 09:00"), "Existing"),
+        (_get_dt("2022-09-05 10:00"), "New"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, end, expected_tables, expected_descriptions",
+    [
+        (None, None, ["event", "event_2022_08", "event_2022_09"], ["A", "B", "Rescheduled"]),
+        ("2022-09-01 00:00", None, ["event", "event_2022_09"], ["B", "Rescheduled"]),
+        ("2022-08-31 12:00", "2022-09-01 09:30", ["event", "event_2022_08", "event_2022_09"], ["A", "B"]),
+        ("2022-09-01 09:30", None, ["event", "event_2022_09"], ["Rescheduled"]),
+        (None, "2022-09-01 00:00", ["event", "event_2022_08"], ["A"]),
+        ("2022-10-01 00:00", None, ["event"], []),
+    ],
+)
+def test_get_all_events_window(sharded, start, end, expected_tables, expected_descriptions):
+    _schedule_events(
+        [
+            ("2022-08-31 17:00", "2022-08-31 18:00", 60, "A"),
+            ("2022-08-31 18:30", "2022-08-31 19:00", 30, "Rescheduled"),
+            ("2022-09-01 09:00", "2022-09-01 10:00", 60, "B"),
+        ]
+    )
+    start, end = start and _get_dt(start), end and _get_dt(end)
+
+    assert [model._meta.table_name for model in get_event_models(start, end)] == expected_tables
+    assert [event.description for event in get_all_events(start, end)] == expected_descriptions
+    assert [event["description"] for event in get_single_events(start, end).dicts()] == expected_descriptions
+
+
+def test_move_event_to_another_month(sharded):
+    scheduler = _schedule_events(
+        [
+            ("2022-08-31 09:00", "2022-08-31 10:00", 60, "A"),
+            ("2022-08-31 10:00", "2022-08-31 11:00", 60, "B"),
+        ]
+    )
+    event_id = next(event.id for event in get_all_events() if event.description == "A")
+
+    scheduler.move_event(event_id, _get_dt("2022-09-01 09:00"))
+
+    assert _get_table_descriptions("2022-08-01 00:00") == ["B"]
+    assert _get_table_descriptions("2022-09-01 00:00") == ["A"]
+    assert [(event.start, event.description) for event in get_all_events()] == [
+        (_get_dt("2022-08-31 10:00"), "B"),
+        (_get_dt("2022-09-01 09:00"), "A"),
+    ]
+
+    scheduler.delete_event(event_id)
+    assert _get_table_descriptions("2022-09-01 00:00") == []
+
+
+def test_shard_events(sharded, monkeypatch):
+    monkeypatch.setattr(storage, "SHARD_EVENTS_BY_MONTH", False)
+    _schedule_events(
+        [
+            ("2022-07-29 09:00", "2022-07-29 10:00", 60, "A"),
+            ("2022-09-01 09:00", "2022-09-01 10:00", 60, "B"),
+        ]
+    )
+    with pytest.raises(ValidationError, match="Enable sharding with SHARD_EVENTS_BY_MONTH=true"):
+        shard_events()
+    monkeypatch.setattr(storage, "SHARD_EVENTS_BY_MONTH", True)
+
+    shard_events()
+
+    # No table for August, which has no events.
+    assert get_shard_months() == [_get_dt("2022-07-01 00:00"), _get_dt("2022-09-01 00:00")]
+    assert _get_table_descriptions("2022-07-01 00:00") == ["A"]
+    assert _get_table_descriptions("2022-09-01 00:00") == ["B"]
+    assert Event.select().count() == 0
+
+
+def test_migrate_shards(sharded):
+    _schedule_events(
+        [
+            ("2022-08-31 09:00", "2022-08-31 10:00", 60, "A"),
+            ("2022-09-01 09:00", "2022-09-01 10:00", 60, "B"),
+        ]
+    )
+    database = Event._meta.database
+    schema_migrator = SchemaMigrator.from_database(database)
+    # The shard of August is behind the model, a column has been added to the model and another one removed.
+    migrate(
+        schema_migrator.drop_index("event_2022_08", "event202208_requested_start"),
+        schema_migrator.drop_column("event_2022_08", "requested_start"),
+        schema_migrator.add_column("event_2022_08", "location", CharField(null=True)),
+    )
+
+    migrate_shards()
+
+    columns = [field.column_name for field in Event._meta.sorted_fields]
+    for table in ("event_2022_08", "event_2022_09"):
+        assert sorted(column.name for column in database.get_columns(table)) == sorted(columns)
+        assert f"{table.replace('_', '')}_requested_start" in [index.name for index in database.get_indexes(table)]
+    assert [event.description for event in get_all_events()] == ["A", "B"]
+
+
+def _get_dt(datetime_str):
+    return datetime.fromisoformat(datetime_str)
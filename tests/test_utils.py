@@ -2,7 +2,14 @@ from datetime import datetime
 
 import pytest
 
-from src.utils import calculate_duration_minutes, get_next_workday_start, get_workday_end, get_workday_start
+from src.utils import (
+    calculate_duration_minutes,
+    get_day_gaps,
+    get_next_workday_start,
+    get_workday_end,
+    get_workday_start,
+    is_outside_workdays,
+)
 
 
 @pytest.mark.parametrize(
@@ -58,6 +65,22 @@ def test_get_next_workday_start(workday, expected_next_workday_start):
     assert next_workday_start == expected_next_workday_start
 
 
+@pytest.mark.parametrize(
+    "start, end, expected_result",
+    [
+        ("2022-08-22 09:00", "2022-08-22 18:00", False),
+        ("2022-08-22 08:30", "2022-08-22 09:30", True),
+        ("2022-08-22 17:30", "2022-08-22 18:30", True),
+        ("2022-08-22 17:00", "2022-08-23 09:30", True),  # Ends on the next day
+        ("2022-08-27 10:00", "2022-08-27 11:00", True),  # Saturday
+    ],
+)
+def test_is_outside_workdays(start, end, expected_result):
+    event = {"start": datetime.fromisoformat(start), "end": datetime.fromisoformat(end)}
+
+    assert is_outside_workdays(event) is expected_result
+
+
 @pytest.mark.parametrize(
     "start_time, end_time, expected_duration",
     [
@@ -73,3 +96,31 @@ def test_calculate_duration_minutes(start_time, end_time, expected_duration):
     duration = calculate_duration_minutes(start_time, end_time)
 
     assert duration == expected_duration
+
+
+@pytest.mark.parametrize(
+    "day_events, expected_gaps",
+    [
+        ([], [("2022-08-22 09:00", "2022-08-22 18:00")]),
+        (
+            [("2022-08-22 08:00", "2022-08-22 09:30"), ("2022-08-22 12:00", "2022-08-22 13:00")],
+            [("2022-08-22 09:30", "2022-08-22 12:00"), ("2022-08-22 13:00", "2022-08-22 18:00")],
+        ),
+        (
+            [("2022-08-22 10:00", "2022-08-22 12:00"), ("2022-08-22 11:00", "2022-08-22 11:30")],
+            [("2022-08-22 09:00", "2022-08-22 10:00"), ("2022-08-22 12:00", "2022-08-22 18:00")],
+        ),
+        ([("2022-08-22 09:00", "2022-08-22 18:00")], []),
+    ],
+)
+def test_get_day_gaps(day_events, expected_gaps):
+    day_events = [
+        {"start": datetime.fromisoformat(start), "end": datetime.fromisoformat(end)} for start, end in day_events
+    ]
+    expected_gaps = [
+        {"start": datetime.fromisoformat(start), "end": datetime.fromisoformat(end)} for start, end in expected_gaps
+    ]
+
+    gaps = get_day_gaps(day_events, datetime.fromisoformat("2022-08-22 00:00"))
+
+    assert gaps == expected_gaps
@@ -0,0 +1,78 @@
+import random
+from copy import deepcopy
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.scheduler import Scheduler
+from src.vectorised import get_rescheduling_flags
+
+
+def _random_events(rng: random.Random, count: int, description: str) -> list[dict]:
+    """Return random events around workdays, with a lot of equal starts and overlaps."""
+    events = []
+    for i in range(count):
+        start = datetime(2022, 8, 22, 7) + timedelta(days=rng.randrange(14), minutes=5 * rng.randrange(150))
+        duration = 5 * rng.randrange(1, 30)
+        end = start + timedelta(minutes=duration)
+        events.append({"start": start, "end": end, "duration": duration, "description": f"{description} {i}"})
+    return sorted(events, key=lambda event: event["start"])
+
+
+def _get_scheduler(engine: str, existing_events: list[dict], recurring_events: list[dict]) -> Scheduler:
+    scheduler = Scheduler(engine=engine)
+    scheduler.existing_events = deepcopy(existing_events)
+    scheduler.recurring_events = deepcopy(recurring_events)
+    return scheduler
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_numpy_engine_matches_python_engine(seed):
+    rng = random.Random(seed)
+    existing_events = _random_events(rng, rng.randrange(0, 60), "existing")
+    for event in existing_events:
+        event.pop("duration")
+    new_events = _random_events(rng, rng.randrange(1, 200), "new")
+    recurring_events = [
+        {
+            "start": datetime(2022, 8, 22, 12),
+            "end": datetime(2022, 8, 22, 12, 30),
+            "description": "Lunch",
+            "recurrence": "weekdays",
+            "recurrence_until": date(2022, 9, 2),
+            "exdates": {datetime(2022, 8, 24, 12)},
+        }
+    ][: seed % 2]
+
+    python_scheduler = _get_scheduler("python", existing_events, recurring_events)
+    python_scheduler.split_new_events(deepcopy(new_events))
+    numpy_scheduler = _get_scheduler("numpy", existing_events, recurring_events)
+    numpy_scheduler.split_new_events(deepcopy(new_events))
+
+    assert numpy_scheduler.scheduled_events == python_scheduler.scheduled_events
+    assert numpy_scheduler.unscheduled_events == python_scheduler.unscheduled_events
+    assert numpy_scheduler.unscheduled_event_durations == python_scheduler.unscheduled_event_durations
+    assert numpy_scheduler.existing_events == python_scheduler.existing_events
+
+
+def test_get_rescheduling_flags():
+    existing_events = [{"start": datetime(2022, 8, 23, 13), "end": datetime(2022, 8, 23, 14)}]
+    new_events = [
+        {"start": datetime(2022, 8, 23, 8, 30), "end": datetime(2022, 8, 23, 9, 30)},  # Before the workday
+        {"start": datetime(2022, 8, 23, 12), "end": datetime(2022, 8, 23, 13)},
+        {"start": datetime(2022, 8, 23, 12, 30), "end": datetime(2022, 8, 23, 13, 30)},  # Overlaps existing event
+        {"start": datetime(2022, 8, 23, 17), "end": datetime(2022, 8, 23, 18, 30)},  # After the workday
+        {"start": datetime(2022, 8, 27, 10), "end": datetime(2022, 8, 27, 11)},  # Saturday
+    ]
+    occurrences = [{"start": datetime(2022, 8, 23, 11, 30), "end": datetime(2022, 8, 23, 12, 15)}]
+
+    flags = get_rescheduling_flags(existing_events, new_events, occurrences)
+
+    assert flags.tolist() == [True, True, True, True, True]
+    after_existing_event = {"start": datetime(2022, 8, 23, 14), "end": datetime(2022, 8, 23, 15)}
+    assert get_rescheduling_flags(existing_events, [after_existing_event]).tolist() == [False]
+
+
+def test_unknown_engine():
+    with pytest.raises(Exception, match="Scheduler engine should be one of python, numpy: rust"):
+        Scheduler(engine="rust")